@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import random
+
+def _year(rnd):
+    return "%04d" % rnd.randint(1750, 2025)
+
+def _month(rnd):
+    return _year(rnd) + "-%02d" % rnd.randint(1, 12)
+
+def _day(rnd):
+    return _month(rnd) + "-%02d" % rnd.randint(1, 28)
+
+def _time(rnd):
+    return "%02d:%02d" % (rnd.randint(0, 23), rnd.randint(0, 59))
+
+def _seconds(rnd):
+    return _time(rnd) + ":%02d" % rnd.randint(0, 59)
+
+def _offset(rnd, separator):
+    sign = rnd.choice("+-")
+    return sign + "%02d" % rnd.randint(0, 14) + separator + rnd.choice(["00", "30", "45"])
+
+def _duration(rnd):
+    return rnd.choice(["P1Y", "P6M", "P1M", "P3D", "P1W", "PT12H", "P1DT2H30M"])
+
+def _invalid(rnd):
+    return rnd.choice([
+        lambda: _day(rnd).replace("-", "\\", 1),
+        lambda: _day(rnd) + "T%02d:00" % rnd.randint(24, 99),
+        lambda: _day(rnd) + "T12:%02d" % rnd.randint(60, 99),
+        lambda: _day(rnd) + "T12:00:%02d" % rnd.randint(60, 99),
+        lambda: _year(rnd) + "-02-%02d" % rnd.randint(30, 31),
+        lambda: _day(rnd) + "+00:00",
+        lambda: "%02d-%02d" % (rnd.randint(1, 12), rnd.randint(1, 28)),
+        lambda: rnd.choice(["", "--", "unknown", "n/a", "1990s", "ca. 1900"])
+    ])()
+
+# Every shape the tokenizer and parser support, plus invalid values.
+SHAPES = {
+    "year": _year,
+    "month": _month,
+    "day": _day,
+    "datetime": lambda rnd: _day(rnd) + "T" + _time(rnd),
+    "datetime_seconds": lambda rnd: _day(rnd) + "T" + _seconds(rnd),
+    "datetime_space": lambda rnd: _day(rnd) + " " + _seconds(rnd),
+    "utc": lambda rnd: _day(rnd) + "T" + _seconds(rnd) + "Z",
+    "offset": lambda rnd: _day(rnd) + "T" + _time(rnd) + _offset(rnd, ":"),
+    "offset_compact": lambda rnd: _day(rnd) + "T" + _time(rnd) + _offset(rnd, ""),
+    "year_range": lambda rnd: _year(rnd) + "/" + _year(rnd),
+    "month_range": lambda rnd: _month(rnd) + "/" + _month(rnd),
+    "day_range": lambda rnd: _day(rnd) + "/" + _day(rnd),
+    "datetime_range": lambda rnd: _day(rnd) + "T" + _seconds(rnd) + "/" + _day(rnd) + " " + _time(rnd) + _offset(rnd, ""),
+    "end_day": lambda rnd: _day(rnd) + "/%02d" % rnd.randint(1, 28),
+    "end_month_day": lambda rnd: _day(rnd) + "/%02d-%02d" % (rnd.randint(1, 12), rnd.randint(1, 28)),
+    "end_time": lambda rnd: _day(rnd) + "T" + _time(rnd) + "/" + _time(rnd),
+    "end_datetime_separator": lambda rnd: _day(rnd) + "T" + _time(rnd) + "/T" + _time(rnd),
+    "start_duration": lambda rnd: _day(rnd) + "/" + _duration(rnd),
+    "duration_end": lambda rnd: _duration(rnd) + "/" + _day(rnd),
+    "repeat": lambda rnd: "R%d/" % rnd.randint(2, 100) + _day(rnd) + "/" + _duration(rnd),
+    "invalid": _invalid
+}
+
+# Rough mix of an occurrence eventDate column.
+DEFAULT_MIX = {
+    "year": 15,
+    "month": 10,
+    "day": 40,
+    "datetime": 3,
+    "datetime_seconds": 3,
+    "datetime_space": 1,
+    "utc": 3,
+    "offset": 2,
+    "offset_compact": 1,
+    "year_range": 3,
+    "month_range": 2,
+    "day_range": 4,
+    "datetime_range": 1,
+    "end_day": 2,
+    "end_month_day": 1,
+    "end_time": 1,
+    "end_datetime_separator": 1,
+    "start_duration": 1,
+    "duration_end": 1,
+    "repeat": 1,
+    "invalid": 7
+}
+
+def values(shape, cardinality, seed=0):
+    # distinct values for one shape, the same for a given seed
+    rnd = random.Random("%s-%d" % (shape, seed))
+    make = SHAPES[shape]
+    result = []
+    seen = set()
+    attempts = 0
+    while len(result) < cardinality and attempts < cardinality * 20:
+        attempts += 1
+        text = make(rnd)
+        if text not in seen:
+            seen.add(text)
+            result.append(text)
+    return result
+
+def generate(n, mix=None, cardinality=1000, seed=0):
+    # n (shape, text) pairs drawn with the given weights from cardinality distinct values per shape
+    if mix is None:
+        mix = DEFAULT_MIX
+    shapes = sorted(mix)
+    pools = dict((shape, values(shape, cardinality, seed)) for shape in shapes)
+    rnd = random.Random(seed)
+    weights = [mix[shape] for shape in shapes]
+    return [(shape, rnd.choice(pools[shape])) for shape in rnd.choices(shapes, weights, k=n)]
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+from isodateparser import ISODateParser, ParseCache, parse_many
+import corpus
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+def _parse(texts):
+    for text in texts:
+        try:
+            ISODateParser(text)
+        except ValueError:
+            pass
+
+def _parse_cached(texts):
+    for result in parse_many(texts, cache=ParseCache(), errors="ignore"):
+        pass
+
+def _best(function, texts, repeat):
+    best = None
+    for i in range(repeat):
+        started = time.perf_counter()
+        function(texts)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def _calibrate(repeat):
+    # fixed pure Python workload, so baselines from another machine can be compared
+    texts = [str(i) for i in range(20000)]
+    def work(texts):
+        total = 0
+        for text in texts:
+            total += int(text[-2:] or "0") + len(text.split("0"))
+        return total
+    return len(texts) / _best(work, texts, repeat)
+
+def _memory(texts):
+    # blocks and bytes retained per kept parser instance (not allocations, which
+    # tracemalloc does not count), and peak traced memory
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = []
+    for text in texts:
+        try:
+            results.append(ISODateParser(text))
+        except ValueError:
+            pass
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    return blocks / float(len(texts)), size / float(len(texts)), peak
+
+def run(n=2000, cardinality=1000, repeat=3, shapes=None, memory=True, runs=5):
+    if shapes is None:
+        shapes = sorted(corpus.SHAPES)
+    workloads = []
+    for shape in shapes:
+        pool = corpus.values(shape, cardinality)
+        workloads.append((shape, _parse, [pool[i % len(pool)] for i in range(n)]))
+    workloads.append(("mix_cached", _parse_cached, [text for shape, text in corpus.generate(n * 5, cardinality=cardinality)]))
+    # The baseline is the median of runs rounds, each taking the best of repeat per
+    # workload. Rounds go over all workloads so a slow phase of the machine hits
+    # every shape once instead of all timings of one shape.
+    timings = dict((workload[0], []) for workload in workloads)
+    calibrations = []
+    for i in range(runs):
+        calibrations.append(_calibrate(repeat))
+        for shape, function, texts in workloads:
+            timings[shape].append(_best(function, texts, repeat))
+    results = {"calibration": statistics.median(calibrations), "shapes": {}}
+    for shape, function, texts in workloads:
+        median = statistics.median(timings[shape])
+        # how far the slowest round fell below the median, the noise of this machine
+        result = {"parses_per_second": len(texts) / median, "spread": 1.0 - median / max(timings[shape])}
+        if memory and function is _parse:
+            blocks, size, peak = _memory(texts[:min(n, 500)])
+            result.update({"retained_blocks_per_result": blocks, "retained_bytes_per_result": size, "peak_bytes": peak})
+        results["shapes"][shape] = result
+    return results
+
+def compare(results, baseline, threshold):
+    # Throughput relative to the calibration workload, so the check holds on slower
+    # machines. A faster calibration does not raise the expectations: the small
+    # calibration loop speeds up more than parsing does. The allowed drop is the
+    # threshold plus the run-to-run spread recorded with the baseline.
+    failures = []
+    scale = min(1.0, results["calibration"] / baseline["calibration"])
+    for shape, base in sorted(baseline["shapes"].items()):
+        if shape not in results["shapes"]:
+            continue
+        minimum = base["parses_per_second"] * scale * (1.0 - threshold - base.get("spread", 0.0))
+        actual = results["shapes"][shape]["parses_per_second"]
+        if actual < minimum:
+            failures.append("%s: %.0f parses/s, expected at least %.0f" % (shape, actual, minimum))
+    return failures
+
+def report(results):
+    lines = ["%-24s %14s %10s %10s %12s" % ("shape", "parses/s", "kept blk", "kept B", "peak KiB")]
+    for shape, result in sorted(results["shapes"].items()):
+        if "retained_blocks_per_result" in result:
+            lines.append("%-24s %14.0f %10.1f %10.0f %12.1f" % (shape, result["parses_per_second"], result["retained_blocks_per_result"], result["retained_bytes_per_result"], result["peak_bytes"] / 1024.0))
+        else:
+            lines.append("%-24s %14.0f" % (shape, result["parses_per_second"]))
+    lines.append("calibration %.0f ops/s" % results["calibration"])
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ISODateParser on a synthetic eventDate corpus")
+    parser.add_argument("-n", type=int, default=2000, help="parses per shape (default: 2000)")
+    parser.add_argument("--cardinality", type=int, default=1000, help="distinct values per shape (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs (default: 3)")
+    parser.add_argument("--runs", type=int, default=5, help="median of this many best-of-repeat timings (default: 5)")
+    parser.add_argument("--shapes", nargs="+", choices=sorted(corpus.SHAPES), help="only these shapes")
+    parser.add_argument("--no-memory", action="store_true", help="skip allocation and peak memory measurements")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (default: bench/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed throughput drop against the baseline, on top of its run-to-run spread (default: 0.25)")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.n, args.cardinality, args.repeat, args.shapes, not args.no_memory, args.runs)
+    print(report(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.threshold)
+        for failure in failures:
+            print("REGRESSION " + failure)
+        return 1 if failures else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,22 +3,310 @@ import logging
 import json
 import calendar
 import datetime
+import mmap
+import re
+import time
+from array import array
+from collections import Counter, OrderedDict, deque, namedtuple
+from itertools import islice
+from types import MappingProxyType
+
+__version__ = "0.1.7"
+
+# Precompiled recognizer for the common shapes (YYYY, YYYY-MM, YYYY-MM-DD, optional
+# time and timezone, and ranges of these). Anything else goes through the tokenizer.
+_FAST_PART = r"(\d+)(?:-(\d+)(?:-(\d+))?)?(?:[T ](\d+):(\d+)(?::(\d+))?(?:(Z)|([+-])(\d{2})(?::?(\d{2}))?)?)?"
+_FAST = re.compile(_FAST_PART + "(?:/" + _FAST_PART + ")?$", re.ASCII)
+
+_logger = logging.getLogger(__name__)
+
+# The same shapes for bytes-like input, with the U+2212 minus sign in UTF-8 accepted
+# wherever "-" is. Only fully specified values are handled here, the rest is decoded.
+_BYTES_MINUS = b"(?:-|\xe2\x88\x92)"
+_BYTES_PART = rb"(\d{4})(?:MINUS(\d{2})(?:MINUS(\d{2}))?)?(?:[T ](\d{2}):(\d{2})(?::(\d{2}))?(?:(Z)|(\+|MINUS)(\d{2})(?::?(\d{2}))?)?)?".replace(b"MINUS", _BYTES_MINUS)
+_FAST_BYTES = re.compile(_BYTES_PART + b"(?:/" + _BYTES_PART + b")?")
+_NEWLINE = re.compile(b"\n")
+
+_SHAPE = str.maketrans("0123456789", "9999999999")
+
+_FAILURE_REASONS = (
+    "Unexpected character",
+    "No year in date",
+    "Impossible hours value",
+    "Impossible minutes value",
+    "Impossible seconds value",
+    "Time includes unexpected character",
+    "Invalid duration",
+    "Duration needs a start or an end",
+    "Duration without period designator",
+    "Invalid repeat",
+    "Repeating interval needs a start and an end or a duration"
+)
+
+class ParseProfiler(object):
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.timings = Counter()
+        self.calls = Counter()
+        self.shapes = Counter()
+        self.failures = Counter()
+
+    def add(self, stage, seconds):
+        self.timings[stage] += seconds
+        self.calls[stage] += 1
+
+    def fail(self, error):
+        message = str(error)
+        for reason in _FAILURE_REASONS:
+            if message.startswith(reason):
+                message = reason
+                break
+        self.failures[message] += 1
+
+    def reset(self):
+        self.timings.clear()
+        self.calls.clear()
+        self.shapes.clear()
+        self.failures.clear()
+
+    def report(self):
+        lines = list()
+        for stage in sorted(self.timings):
+            lines.append("%-12s %10d calls %12.6f s" % (stage, self.calls[stage], self.timings[stage]))
+        for shape, count in self.shapes.most_common():
+            lines.append("shape %-40s %10d" % (shape, count))
+        for reason, count in self.failures.most_common():
+            lines.append("failure %-38s %10d" % (reason, count))
+        return "\n".join(lines)
+
+# Profiling is opt-in, the parser only checks this for None when it is off.
+_profiler = None
+
+def enable_profiling(profiler=None, trace=False):
+    global _profiler
+    if profiler is None:
+        profiler = ParseProfiler(trace=trace)
+    _profiler = profiler
+    return profiler
+
+def disable_profiling():
+    global _profiler
+    profiler = _profiler
+    _profiler = None
+    return profiler
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _days_in_month(year, month):
+    if not 1 <= month <= 12:
+        raise calendar.IllegalMonthError(month)
+    if month == 2 and calendar.isleap(year):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+def _start_ymd(year, month, day):
+    return year, 1 if month is None else month, 1 if day is None else day
+
+def _end_ymd(start_year, start_month, start_day, end_year, end_month, end_day):
+    year = start_year if end_year is None else end_year
+    if end_month is not None:
+        month = end_month
+    elif start_month is not None:
+        month = start_month
+    else:
+        month = 12
+    if end_day is not None:
+        day = end_day
+    elif start_day is not None:
+        day = start_day
+    else:
+        day = _days_in_month(year, month)
+    return year, month, day
+
+_DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+def _ordinal(year, month, day):
+    # same as datetime.date(year, month, day).toordinal()
+    y = year - 1
+    days = y * 365 + y // 4 - y // 100 + y // 400 + _DAYS_BEFORE_MONTH[month - 1] + day
+    if month > 2 and calendar.isleap(year):
+        days += 1
+    return days
+
+_EPOCH_ORDINAL = 719163
+_MAX_ORDINAL = datetime.date.max.toordinal()
+
+def _ordinal_year(ordinal):
+    # proleptic Gregorian year of any day ordinal, also outside the range of datetime.date
+    n400, n = divmod(ordinal - 1, 146097)
+    n100, n = divmod(n, 36524)
+    n4, n = divmod(n, 1461)
+    n1, n = divmod(n, 365)
+    year = n400 * 400 + n100 * 100 + n4 * 4 + n1
+    if n100 == 4 or n1 == 4:
+        return year
+    return year + 1
+
+def _interval_ordinals(start, end):
+    # start and end are components in _FIELDS order, the result is (start, mid, end)
+    # and matches the toordinal() of the dates built by ISODateParser
+    start_ymd = _start_ymd(start[0], start[1], start[2])
+    end_ymd = _end_ymd(start[0], start[1], start[2], end[0], end[1], end[2])
+    _check_ymd(*start_ymd)
+    _check_ymd(*end_ymd)
+    first = _ordinal(*start_ymd)
+    last = _ordinal(*end_ymd)
+    return first, first + (last - first) // 2, last
+
+def _seconds(components, offset):
+    return (components[3] or 0) * 3600 + (components[4] or 0) * 60 + (components[5] or 0) - offset * 60
+
+def _offsets(start, end, default_offset):
+    # UTC offsets in minutes of the start and end, an end without time or timezone
+    # takes the one of the start
+    start_offset = default_offset if start[8] is None else start[8]
+    end_offset = start_offset if end[3] is None or end[8] is None else end[8]
+    return start_offset, end_offset
+
+def _interval_epochs(start, end, default_offset=0):
+    # Unix time in seconds of (start, mid, end). Missing times are midnight, an end
+    # without time takes the time of the start, and values without timezone have
+    # default_offset (UTC unless given).
+    first, mid, last = _interval_ordinals(start, end)
+    start_offset, end_offset = _offsets(start, end, default_offset)
+    first = (first - _EPOCH_ORDINAL) * 86400 + _seconds(start, start_offset)
+    last = (last - _EPOCH_ORDINAL) * 86400 + _seconds(start if end[3] is None else end, end_offset)
+    return first, first + (last - first) // 2, last
+
+_UTC_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+_TZINFOS = {0: datetime.timezone.utc}
+
+def _tzinfo(offset):
+    # one shared tzinfo per offset in minutes
+    try:
+        return _TZINFOS[offset]
+    except KeyError:
+        return _TZINFOS.setdefault(offset, datetime.timezone(datetime.timedelta(minutes=offset)))
+
+def _interval_datetimes(start, end, utc, default_offset):
+    first, mid, last = _interval_epochs(start, end, default_offset)
+    values = [_UTC_EPOCH + datetime.timedelta(seconds=value) for value in (first, mid, last)]
+    if not utc:
+        start_offset, end_offset = _offsets(start, end, default_offset)
+        values = [values[0].astimezone(_tzinfo(start_offset)), values[1].astimezone(_tzinfo(start_offset)), values[2].astimezone(_tzinfo(end_offset))]
+    return tuple(values)
+
+_DATE_DESIGNATORS = (("Y", "years"), ("M", "months"), ("W", "weeks"), ("D", "days"))
+_TIME_DESIGNATORS = (("H", "hours"), ("M", "minutes"), ("S", "seconds"))
+
+def _shift(components, duration, factor):
+    # Adds factor times duration to a components dict. Years and months are added
+    # first, clamping the day to the end of the month, then weeks, days and time.
+    # The result keeps the precision of the components, or of the duration if finer.
+    result = dict(components)
+    if factor == 0:
+        return result
+    if components["year"] is None:
+        raise ValueError("No year in date")
+    get = duration.get
+    has_time = components["hours"] is not None or bool(get("hours") or get("minutes") or get("seconds"))
+    has_day = components["day"] is not None or bool(get("weeks") or get("days")) or has_time
+    has_month = components["month"] is not None or bool(get("months")) or has_day
+    month = 1 if components["month"] is None else components["month"]
+    total = components["year"] * 12 + month - 1 + factor * (get("years", 0) * 12 + get("months", 0))
+    year, month = total // 12, total % 12 + 1
+    if not has_day:
+        result["year"] = year
+        result["month"] = month if has_month else None
+        return result
+    day = 1 if components["day"] is None else components["day"]
+    ordinal = _ordinal(year, month, min(day, _days_in_month(year, month))) + factor * (get("weeks", 0) * 7 + get("days", 0))
+    if has_time:
+        seconds = (components["hours"] or 0) * 3600 + (components["minutes"] or 0) * 60 + (components["seconds"] or 0)
+        seconds += factor * (get("hours", 0) * 3600 + get("minutes", 0) * 60 + get("seconds", 0))
+        days, seconds = divmod(seconds, 86400)
+        ordinal += days
+        result["hours"] = seconds // 3600
+        if components["minutes"] is not None or get("minutes") or get("seconds"):
+            result["minutes"] = seconds // 60 % 60
+        if components["seconds"] is not None or get("seconds"):
+            result["seconds"] = seconds % 60
+    if not 1 <= ordinal <= _MAX_ORDINAL:
+        raise ValueError("year %d is out of range" % _ordinal_year(ordinal))
+    date = datetime.date.fromordinal(ordinal)
+    result["year"] = date.year
+    result["month"] = date.month
+    result["day"] = date.day
+    return result
+
+def _step(components, factor):
+    # moves a date without time by factor units of its precision, a value with a
+    # time is an instant and stays where it is
+    if components["hours"] is not None:
+        return dict(components)
+    if components["day"] is not None:
+        unit = {"days": 1}
+    elif components["month"] is not None:
+        unit = {"months": 1}
+    else:
+        unit = {"years": 1}
+    return _shift(components, unit, factor)
+
+def _covered(components, duration, first, last, anchor):
+    # Start and end of first to last times duration from a start, or back from an
+    # end. A date end is the last unit covered, so 2010/P1Y is the year 2010 and
+    # P1D/2010 is 2010-12-31, an end with a time is the instant itself.
+    if not any(duration.values()):
+        return dict(components), dict(components)
+    if anchor == "start":
+        return _shift(components, duration, first), _step(_shift(components, duration, last), -1)
+    after = _step(components, 1)
+    start = _shift(after, duration, -last)
+    return start, _expand(_step(_shift(after, duration, -first), -1), start)
+
+def _expand(end, start):
+    # An end less precise than its start is filled with its last month and day, the
+    # end filling rules would take them from the start (P3D/2010 ends 2010-12-31).
+    if end["month"] is None and start["month"] is not None:
+        end["month"] = 12
+    if end["day"] is None and start["day"] is not None:
+        end["day"] = _days_in_month(end["year"], end["month"])
+    return end
+
+def _check_ymd(year, month, day):
+    # same checks and messages as datetime.date, without building one
+    if year is None:
+        raise ValueError("No year in date")
+    if not 1 <= year <= 9999:
+        raise ValueError("year %d is out of range" % year)
+    if not 1 <= month <= 12:
+        raise ValueError("month must be in 1..12")
+    if not 1 <= day <= _days_in_month(year, month):
+        raise ValueError("day is out of range for month")
 
 class Token(object):
+    __slots__ = ("type", "value")
+
     def __init__(self, type, value=None):
         self.type = type
         self.value = value
 
 class ISODateParser(object):
 
-    def __init__(self, text):
-        self._logger = logging.getLogger(__name__)
+    # set on the instance for durations (a dict of years, months, weeks, days, hours,
+    # minutes and seconds) and repeating intervals (repeat is None when unbounded)
+    duration = None
+    repeating = False
+    repeat = None
+    _anchor = "start"
 
-        self.dates = {
-            "start": None,
-            "mid": None,
-            "end": None
-        }
+    # Dates are built lazily on first access. Calendar errors (e.g. 2010-02-30) are
+    # still raised by the constructor, unless components_only is set, in which case
+    # they are raised when dates are first accessed.
+    def __init__(self, text, components_only=False):
+        self._dates = {}
         self.components = {
             "start": {
                 "year": None,
@@ -28,7 +316,8 @@ class ISODateParser(object):
                 "minutes": None,
                 "seconds": None,
                 "milliseconds": None,
-                "timezone": None
+                "timezone": None,
+                "offset": None
             },
             "end": {
                 "year": None,
@@ -38,66 +327,118 @@ class ISODateParser(object):
                 "minutes": None,
                 "seconds": None,
                 "milliseconds": None,
-                "timezone": None
+                "timezone": None,
+                "offset": None
             }
         }
         self._which = "start"
         self._input = text
-        self._tokenize()
-        self._disambiguate()
-        self._logger.debug(self._print_tokens(self._tokens))
-        self._parse()
-        self._make_dates()
+        self._tokens = None
+        if _profiler is not None:
+            self._run_profiled(_profiler, components_only)
+            return
+        if not self._parse_fast():
+            self._parse()
+        if not components_only:
+            self._check_dates()
 
-    def _parse(self):
-        self._logger.debug("Parse input: " + self._print_tokens_short(self._tokens))
-        buffer = list()
-        for token in self._tokens:
-            if token.type == "INTERVALSEPARATOR":
-                self._parse_part(buffer)
-                buffer = list()
-                self._which = "end"
-            else:
-                buffer.append(token)
-        self._parse_part(buffer)
+    def _run_profiled(self, profiler, components_only):
+        profiler.shapes[self._input.translate(_SHAPE)] += 1
+        clock = time.perf_counter
+        try:
+            started = clock()
+            fast = self._parse_fast()
+            profiler.add("fast_path", clock() - started)
+            if not fast:
+                started = clock()
+                self._parse()
+                profiler.add("scan", clock() - started)
+                if profiler.trace:
+                    # tokens are only built for the trace
+                    self._tokenize()
+                    self._disambiguate()
+                    _logger.debug(self._print_tokens(self._tokens))
+                    self._tokens = None
+            if profiler.trace:
+                _logger.debug(json.dumps(self.components))
+            if not components_only:
+                started = clock()
+                self._check_dates()
+                profiler.add("check_dates", clock() - started)
+        except ValueError as e:
+            profiler.fail(e)
+            raise
 
-    def _parse_part(self, tokens):
-        self._logger.debug("Parse part: " + self._print_tokens_short(tokens))
-        for token in tokens:
-            if token.type == "DATESEPARATOR" or token.type == "TIMESEPARATOR":
-                return self._parse_date_time(tokens)
-            elif token.type == "DESIGNATOR":
-                return self._parse_duration(tokens)
-        # not separator, assuming year only
-        return self._parse_date_time(tokens)
-
-    def _parse_date_time(self, tokens):
-        self._logger.debug("Parse datetime: " + self._print_tokens_short(tokens))
-        buffer = list()
-        time = False
-        for token in tokens:
-            if token.type == "DATETIMESEPARATOR":
-                self._parse_date(buffer)
-                time = True
-                buffer = list()
-            else:
-                if token.type == "TIMESEPARATOR":
-                    time = True
-                buffer.append(token)
-        if time:
-            self._parse_time_timezone(buffer)
-        else:
-            self._parse_date(buffer)
+    def _parse_fast(self):
+        match = _FAST.match(self._input)
+        if match is None:
+            return False
+        groups = match.groups()
+        self._parse_fast_part(groups[0:10])
+        if groups[10] is not None:
+            self._which = "end"
+            self._parse_fast_part(groups[10:20])
+        return True
 
-    def _parse_date(self, tokens):
-        self._logger.debug("Parse date: " + self._print_tokens_short(tokens))
+    def _parse_fast_part(self, groups):
+        year, month, day, hours, minutes, seconds, utc, sign, tzhours, tzminutes = groups
+        self._set_date([number for number in (year, month, day) if number is not None])
+        if hours is not None:
+            self._set_time(0, hours)
+            self._set_time(1, minutes)
+            if seconds is not None:
+                self._set_time(2, seconds)
+            if utc is not None:
+                self.components[self._which]["timezone"] = 0
+                self.components[self._which]["offset"] = 0
+            elif sign is not None:
+                numbers = [tzhours] if tzminutes is None else [tzhours, tzminutes]
+                self._set_timezone(-1.0 if sign == "-" else 1.0, numbers)
 
-        numbers = []
+    def _parse(self):
+        scan = _scan(self._input)
+        if scan.error is not None:
+            raise ValueError(_scan_message(self._input, scan.error))
+        values = scan.values
+        self.components["start"].update(zip(_SCAN_FIELDS, values[0:8]))
+        self.components["end"].update(zip(_SCAN_FIELDS, values[8:16]))
+        if scan.repeating:
+            self.repeating = True
+            self.repeat = scan.repeat
+        if scan.period is not None:
+            self.duration = scan.duration
+            if scan.period == 1:
+                self.components["end"] = _covered(self.components["start"], self.duration, 0, 1, "start")[1]
+            else:
+                self.components["start"], self.components["end"] = _covered(self.components["end"], self.duration, 0, 1, "end")
+                self._anchor = "end"
+        elif self.repeating:
+            # the difference needs valid dates, report them like any other interval
+            self._check_dates()
+            self.duration = self._difference()
 
-        for token in tokens:
-            if token.type == "NUMBER":
-                numbers.append(token.value)
+    def _difference(self):
+        # duration between the start and end of a repeating interval, in the unit
+        # of the start precision; a date end is covered, so R/2010/2011 repeats
+        # every two years
+        start = self.components["start"]
+        year, month, day = self._end_ymd()
+        if start["day"] is not None:
+            end = self.components["end"]
+            seconds = (_ordinal(year, month, day) - _ordinal(*self._start_ymd())) * 86400
+            if start["hours"] is None and end["hours"] is None:
+                seconds += 86400
+            for field, size in (("hours", 3600), ("minutes", 60), ("seconds", 1)):
+                value = start[field] if end[field] is None else end[field]
+                seconds += ((value or 0) - (start[field] or 0)) * size
+            days, seconds = divmod(seconds, 86400)
+            duration = {"days": days, "hours": seconds // 3600, "minutes": seconds // 60 % 60, "seconds": seconds % 60}
+            return dict((field, value) for field, value in duration.items() if value or field == "days")
+        elif start["month"] is not None:
+            return {"months": (year - start["year"]) * 12 + month - start["month"] + 1}
+        return {"years": year - start["year"] + 1}
 
+    def _set_date(self, numbers):
         if self._which == "start" and len(numbers) == 0:
             raise ValueError("No year in date")
 
@@ -128,80 +469,68 @@ class ISODateParser(object):
             elif state == 2:
                 self.components[self._which]["day"] = int(number)
 
-    def _parse_time_timezone(self, tokens):
-        self._logger.debug("Parse time and timezone: " + self._print_tokens_short(tokens))
-        buffer = list()
-        timezone = False
-        for token in tokens:
-            if token.type == "TIMEZONESIGN" or token.type == "UTC":
-                self._parse_time(buffer)
-                timezone = True
-                buffer = list()
-            buffer.append(token)
-        if timezone:
-            self._parse_timezone(buffer)
-        else:
-            self._parse_time(buffer)
+    def _set_time(self, state, value):
+        if state == 0:
+            if int(value) > 23:
+                raise ValueError("Impossible hours value: " + value)
+            self.components[self._which]["hours"] = int(value)
+        elif state == 1:
+            if int(value) > 59:
+                raise ValueError("Impossible minutes value: " + value)
+            self.components[self._which]["minutes"] = int(value)
+        elif state == 2:
+            if int(value) > 59:
+                raise ValueError("Impossible seconds value: " + value)
+            self.components[self._which]["seconds"] = int(value)
 
-    def _parse_time(self, tokens):
-        self._logger.debug("Parse time: " + self._print_tokens_short(tokens))
+    def _set_timezone(self, sign, numbers):
         state = 0
-        for token in tokens:
-            if token.type == "NUMBER":
+        hours = None
+        minutes = 0.0
+        for number in numbers:
+            if len(number) == 4:
+                hours = int(number[0:2])
+                minutes = int(number[2:4])
+            if len(number) == 2:
                 if state == 0:
-                    if int(token.value) > 23:
-                        raise ValueError("Impossible hours value: " + token.value)
-                    self.components[self._which]["hours"] = int(token.value)
+                    hours = int(number)
                     state += 1
                 elif state == 1:
-                    if int(token.value) > 59:
-                        raise ValueError("Impossible minutes value: " + token.value)
-                    self.components[self._which]["minutes"] = int(token.value)
-                    state += 1
-                elif state == 2:
-                    if int(token.value) > 59:
-                        raise ValueError("Impossible seconds value: " + token.value)
-                    self.components[self._which]["seconds"] = int(token.value)
-            elif token.type != "TIMESEPARATOR":
-                raise ValueError("Time includes unexpected character " + token.value)
-
-    def _parse_timezone(self, tokens):
-        self._logger.debug("Parse timezone: " + self._print_tokens_short(tokens))
-        state = 0
-        hours = None
-        minutes = 0.0
-        sign = 1.0
-        for token in tokens:
-            if token.type == "UTC":
-                self.components[self._which]["timezone"] = 0
-            elif token.type == "TIMEZONESIGN" and token.value == "-":
-                sign = -1.0
-            elif token.type == "NUMBER":
-                if len(token.value) == 4:
-                    hours = int(token.value[0:2])
-                    minutes = int(token.value[2:4])
-                if len(token.value) == 2:
-                    if state == 0:
-                        hours = int(token.value)
-                        state += 1
-                    elif state == 1:
-                        minutes = int(token.value)
+                    minutes = int(number)
         if hours is not None:
+            # timezone in hours is kept for compatibility, offset is exact integer minutes
             self.components[self._which]["timezone"] = sign * (hours + minutes / 60.0)
+            self.components[self._which]["offset"] = int(sign) * (hours * 60 + int(minutes))
 
-    def _parse_duration(self, tokens):
-        self._logger.debug("Parse duration: " + self._print_tokens_short(tokens))
-        pass
+    def occurrences(self):
+        # Lazily yields a ParsedInterval per occurrence of a repeating interval, each
+        # computed from the first one so months do not drift. Unbounded repeats never
+        # end. Intervals anchored at their end go back in time.
+        if not self.repeating:
+            yield ParsedInterval.from_parser(self)
+            return
+        k = 0
+        while self.repeat is None or k < self.repeat:
+            yield self._occurrence(k, k + 1)
+            k += 1
 
-    def _tokenize(self):
-        queue = list(self._input)
-        queue.append("\n")
+    def span(self):
+        # the whole period covered by a bounded repeating interval, None if unbounded
+        if not self.repeating:
+            return ParsedInterval.from_parser(self)
+        if self.repeat is None:
+            return None
+        return self._occurrence(0, self.repeat)
+
+    def _occurrence(self, first, last):
+        return _interval(*_covered(self.components[self._anchor], self.duration, first, last, self._anchor))
 
+    # Tokens are only used to print values, the parser scans the text (see _scan).
+    def _tokenize(self):
         buffer = list()
         self._tokens = list()
 
-        while queue:
-            c = queue.pop(0)
+        for c in self._input + "\n":
 
             if c.isdigit():
                 buffer.append(c)
@@ -249,6 +578,9 @@ class ISODateParser(object):
     def __str__(self):
         lines = list()
         lines.append("Input: " + self._input)
+        if self._tokens is None:
+            self._tokenize()
+            self._disambiguate()
         lines.append(self._print_tokens(self._tokens))
         lines.append(json.dumps(self.components))
         return "\n".join(lines)
@@ -262,44 +594,888 @@ class ISODateParser(object):
             lines.append(line)
         return "\n".join(lines)
 
-    def _print_tokens_short(self, tokens):
-        return "".join([token.value for token in tokens])
+    @property
+    def dates(self):
+        if len(self._dates) < 3:
+            if _profiler is None:
+                self._make_dates()
+            else:
+                started = time.perf_counter()
+                self._make_dates()
+                _profiler.add("make_dates", time.perf_counter() - started)
+        return self._dates
+
+    @property
+    def start_date(self):
+        return self._date("start")
+
+    @property
+    def mid_date(self):
+        return self._date("mid")
+
+    @property
+    def end_date(self):
+        return self._date("end")
+
+    def _date(self, key):
+        try:
+            return self._dates[key]
+        except KeyError:
+            pass
+        if key == "start":
+            value = self._start_date()
+        elif key == "end":
+            value = self._end_date()
+        else:
+            start = self._date("start")
+            value = start + (self._date("end") - start) / 2
+        dates = self._dates
+        dates[key] = value
+        if len(dates) == 3:
+            # keep the historical key order whatever was accessed first
+            self._dates = {"start": dates["start"], "mid": dates["mid"], "end": dates["end"]}
+        return value
+
+    # (start, mid, end) as proleptic Gregorian day ordinals, like date.toordinal()
+    def ordinals(self):
+        return _interval_ordinals(self._components("start"), self._components("end"))
+
+    # (start, mid, end) as Unix time in seconds, including the time of day and timezone
+    def epochs(self, default_offset=0):
+        return _interval_epochs(self._components("start"), self._components("end"), default_offset)
+
+    # (start, mid, end) as timezone aware datetimes, in UTC or in the offset of the
+    # value; default_offset (minutes) applies to values without timezone
+    def datetimes(self, utc=True, default_offset=0):
+        return _interval_datetimes(self._components("start"), self._components("end"), utc, default_offset)
+
+    def _components(self, which):
+        components = self.components[which]
+        return tuple(components[field] for field in _FIELDS)
+
+    def _start_ymd(self):
+        start = self.components["start"]
+        return _start_ymd(start["year"], start["month"], start["day"])
+
+    def _end_ymd(self):
+        start = self.components["start"]
+        end = self.components["end"]
+        return _end_ymd(start["year"], start["month"], start["day"], end["year"], end["month"], end["day"])
 
     def _start_date(self):
-        year = self.components["start"]["year"]
-        if "month" in self.components["start"] and self.components["start"]["month"] is not None:
-            month = self.components["start"]["month"]
+        return datetime.date(*self._start_ymd())
+
+    def _end_date(self):
+        return datetime.date(*self._end_ymd())
+
+    def _check_dates(self):
+        if self.components["start"]["year"] is None:
+            # a time without date, e.g. 12:00
+            raise ValueError("No year in date")
+        _check_ymd(*self._start_ymd())
+        _check_ymd(*self._end_ymd())
+
+    def _make_dates(self):
+        self._date("start")
+        self._date("end")
+        self._date("mid")
+
+    def components(self):
+        return self.components
+
+
+_FIELDS = ("year", "month", "day", "hours", "minutes", "seconds", "milliseconds", "timezone", "offset")
+
+Components = namedtuple("Components", _FIELDS)
+
+_NO_COMPONENTS = Components(*[None] * len(_FIELDS))
+
+class ParsedInterval(object):
+    __slots__ = ("_start", "_end", "_dates")
+
+    def __init__(self, start, end, dates=None):
+        self._start = start
+        self._end = end
+        self._dates = dates
+
+    @classmethod
+    def from_parser(cls, parser):
+        return _interval(parser.components["start"], parser.components["end"])
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def end(self):
+        return self._end
+
+    @property
+    def components(self):
+        return MappingProxyType({
+            "start": MappingProxyType(self._start._asdict()),
+            "end": MappingProxyType(self._end._asdict())
+        })
+
+    @property
+    def dates(self):
+        start, mid, end = self._make_dates()
+        return MappingProxyType({
+            "start": start,
+            "mid": mid,
+            "end": end
+        })
+
+    @property
+    def start_date(self):
+        return self._make_dates()[0]
+
+    @property
+    def mid_date(self):
+        return self._make_dates()[1]
+
+    @property
+    def end_date(self):
+        return self._make_dates()[2]
+
+    def ordinals(self):
+        return _interval_ordinals(self._start, self._end)
+
+    def epochs(self, default_offset=0):
+        return _interval_epochs(self._start, self._end, default_offset)
+
+    def datetimes(self, utc=True, default_offset=0):
+        return _interval_datetimes(self._start, self._end, utc, default_offset)
+
+    def _make_dates(self):
+        if self._dates is None:
+            start, end = self._start, self._end
+            start_date = datetime.date(*_start_ymd(start.year, start.month, start.day))
+            end_date = datetime.date(*_end_ymd(start.year, start.month, start.day, end.year, end.month, end.day))
+            self._dates = (start_date, start_date + (end_date - start_date) / 2, end_date)
+        return self._dates
+
+    def __eq__(self, other):
+        if not isinstance(other, ParsedInterval):
+            return NotImplemented
+        return self._start == other._start and self._end == other._end
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash((self._start, self._end))
+
+    def __reduce__(self):
+        return (ParsedInterval, (self._start, self._end, self._dates))
+
+    def __repr__(self):
+        return "ParsedInterval(start=%r, end=%r)" % (tuple(self._start), tuple(self._end))
+
+def _interval(start, end):
+    end = Components(*[end[field] for field in _FIELDS])
+    if end == _NO_COMPONENTS:
+        end = _NO_COMPONENTS
+    return ParsedInterval(Components(*[start[field] for field in _FIELDS]), end)
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+class ParseCache(object):
+
+    def __init__(self, maxsize=65536):
+        if maxsize < 0:
+            raise ValueError("Cache size must not be negative")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, text):
+        entries = self._entries
+        try:
+            result = entries[text]
+        except KeyError:
+            self.misses += 1
+            try:
+                result = ParsedInterval.from_parser(ISODateParser(text))
+            except ValueError as e:
+                # failures are cached too, bad values repeat as much as good ones
+                result = e
+            if self.maxsize > 0:
+                entries[text] = result
+                if len(entries) > self.maxsize:
+                    entries.popitem(last=False)
+                    self.evictions += 1
+        else:
+            self.hits += 1
+            entries.move_to_end(text)
+        if isinstance(result, ValueError):
+            raise ValueError(*result.args)
+        return result
+
+    def resize(self, maxsize):
+        if maxsize < 0:
+            raise ValueError("Cache size must not be negative")
+        self.maxsize = maxsize
+        while len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+default_cache = ParseCache()
+
+def parse_many(iterable, cache=None, errors="raise", workers=None, chunksize=10000):
+    if errors not in ("raise", "ignore"):
+        raise ValueError("errors must be 'raise' or 'ignore'")
+    if workers is not None and workers > 1:
+        return _parse_parallel(iterable, errors, workers, chunksize)
+    if cache is None:
+        cache = default_cache
+    return _parse_serial(iterable, cache, errors)
+
+def _parse_serial(iterable, cache, errors):
+    get = cache.get
+    for text in iterable:
+        if errors == "raise":
+            yield get(text)
         else:
-            month = 1
-        if "day" in self.components["start"] and self.components["start"]["day"] is not None:
-            day = self.components["start"]["day"]
+            try:
+                yield get(text)
+            except ValueError:
+                yield None
+
+def _parse_chunk(texts):
+    # Runs in the worker processes. Returns the distinct results as plain tuples (or
+    # error messages) and the position of each input in them, to keep IPC small.
+    seen = {}
+    results = []
+    positions = array("l")
+    for text in texts:
+        position = seen.get(text)
+        if position is None:
+            position = seen[text] = len(results)
+            try:
+                parser = ISODateParser(text)
+                start = parser.components["start"]
+                end = parser.components["end"]
+                results.append((tuple(start[field] for field in _FIELDS), tuple(end[field] for field in _FIELDS)))
+            except ValueError as e:
+                results.append(str(e))
+        positions.append(position)
+    return results, positions
+
+def _parse_parallel(iterable, errors, workers, chunksize):
+    from concurrent.futures import ProcessPoolExecutor
+    iterator = iter(iterable)
+    exhausted = False
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # only keep a few chunks in flight so memory stays bounded
+            while not exhausted and len(pending) < 2 * workers:
+                chunk = list(islice(iterator, chunksize))
+                if chunk:
+                    pending.append(executor.submit(_parse_chunk, chunk))
+                else:
+                    exhausted = True
+            if not pending:
+                break
+            results, positions = pending.popleft().result()
+            for i, result in enumerate(results):
+                if not isinstance(result, str):
+                    end = Components(*result[1])
+                    results[i] = ParsedInterval(Components(*result[0]), _NO_COMPONENTS if end == _NO_COMPONENTS else end)
+            for position in positions:
+                result = results[position]
+                if isinstance(result, str):
+                    if errors == "raise":
+                        raise ValueError(result)
+                    yield None
+                else:
+                    yield result
+
+def _bytes_part(groups):
+    year, month, day, hours, minutes, seconds, utc, sign, tzhours, tzminutes = groups
+    if hours is not None:
+        hours = int(hours)
+        minutes = int(minutes)
+        if hours > 23 or minutes > 59:
+            return None
+        if seconds is not None:
+            seconds = int(seconds)
+            if seconds > 59:
+                return None
+        if utc is not None:
+            timezone = offset = 0
+        elif sign is not None:
+            tzhours = int(tzhours)
+            tzminutes = 0 if tzminutes is None else int(tzminutes)
+            timezone = (1.0 if sign == b"+" else -1.0) * (tzhours + tzminutes / 60.0)
+            offset = (1 if sign == b"+" else -1) * (tzhours * 60 + tzminutes)
         else:
-            day = 1
-        return datetime.date(year, month, day)
+            timezone = offset = None
+    else:
+        timezone = offset = None
+    return Components(int(year), None if month is None else int(month), None if day is None else int(day), hours, minutes, seconds, None, timezone, offset)
 
-    def _end_date(self):
-        if "year" in self.components["end"] and self.components["end"]["year"] is not None:
-            year = self.components["end"]["year"]
+def parse_bytes(data, start=0, end=None):
+    # Parses data[start:end] of a bytes, bytearray, memoryview or mmap without copying
+    # it. Values outside the common shapes are decoded and go through ISODateParser.
+    if end is None:
+        end = len(data)
+    match = _FAST_BYTES.fullmatch(data, start, end)
+    if match is not None:
+        groups = match.groups()
+        first = _bytes_part(groups[0:10])
+        last = _NO_COMPONENTS
+        if first is not None and groups[10] is not None:
+            # an end with another precision is filled from the start, leave that to the parser
+            if (groups[11] is None) == (groups[1] is None) and (groups[12] is None) == (groups[2] is None):
+                last = _bytes_part(groups[10:20])
+            else:
+                last = None
+        if first is not None and last is not None:
+            _check_ymd(*_start_ymd(first.year, first.month, first.day))
+            _check_ymd(*_end_ymd(first.year, first.month, first.day, last.year, last.month, last.day))
+            return ParsedInterval(first, last)
+    return ParsedInterval.from_parser(ISODateParser(bytes(data[start:end]).decode("utf-8")))
+
+def parse_lines(data, errors="raise"):
+    # Yields a result per newline delimited value of a bytes-like object or mmap.
+    if errors not in ("raise", "ignore"):
+        raise ValueError("errors must be 'raise' or 'ignore'")
+    size = len(data)
+    position = 0
+    while position < size:
+        match = _NEWLINE.search(data, position)
+        end = size if match is None else match.start()
+        last = end
+        if last > position and data[last - 1] == 13:
+            last -= 1
+        if errors == "raise":
+            yield parse_bytes(data, position, last)
         else:
-            year = self.components["start"]["year"]
-        if "month" in self.components["end"] and self.components["end"]["month"] is not None:
-            month = self.components["end"]["month"]
-        elif "month" in self.components["start"] and self.components["start"]["month"] is not None:
-            month = self.components["start"]["month"]
+            try:
+                yield parse_bytes(data, position, last)
+            except ValueError:
+                yield None
+        position = end + 1
+
+def parse_file(path, errors="raise"):
+    # parse_lines over a memory-mapped file
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        for result in parse_lines(data, errors):
+            yield result
+    finally:
+        data.close()
+
+# Error codes of validate() and check(). A zone after a date without time (e.g.
+# 1990-01-02+05:00) makes the parser read the year as hours, MISSING_TIME is
+# reported instead of IMPOSSIBLE_HOURS there.
+VALID = 0
+UNEXPECTED_CHARACTER = 1
+MISSING_YEAR = 2
+IMPOSSIBLE_HOURS = 3
+IMPOSSIBLE_MINUTES = 4
+IMPOSSIBLE_SECONDS = 5
+INVALID_DATE = 6
+MISSING_TIME = 7
+UNEXPECTED_TIME_CHARACTER = 8
+INVALID_DURATION = 9
+
+ERRORS = (
+    "valid",
+    "unexpected character",
+    "missing year",
+    "impossible hours",
+    "impossible minutes",
+    "impossible seconds",
+    "invalid calendar date",
+    "missing time before zone",
+    "unexpected character in time",
+    "invalid duration or repeat"
+)
+
+Validation = namedtuple("Validation", ["valid", "codes", "positions"])
+
+_ERROR_CODES = (
+    ("Unexpected character", UNEXPECTED_CHARACTER),
+    ("No year in date", MISSING_YEAR),
+    ("Impossible hours value", IMPOSSIBLE_HOURS),
+    ("Impossible minutes value", IMPOSSIBLE_MINUTES),
+    ("Impossible seconds value", IMPOSSIBLE_SECONDS),
+    ("Time includes unexpected character", UNEXPECTED_TIME_CHARACTER),
+    ("Invalid duration", INVALID_DURATION),
+    ("Duration", INVALID_DURATION),
+    ("Invalid repeat", INVALID_DURATION),
+    ("Repeating interval", INVALID_DURATION)
+)
+
+def _error_code(error):
+    message = str(error)
+    for reason, code in _ERROR_CODES:
+        if message.startswith(reason):
+            return code
+    return INVALID_DATE
+
+def _valid_ymd(year, month, day):
+    return 1 <= year <= 9999 and 1 <= month <= 12 and 1 <= day <= _days_in_month(year, month)
+
+# Characters the parser knows, besides digits.
+_TOKEN_CHARACTERS = frozenset(" T:/Z+-−PYMWDHSR\n")
+
+_Scan = namedtuple("_Scan", ["error", "values", "end_position", "repeating", "repeat", "period", "duration"])
+
+def _scan_digits(text, i, n):
+    # end of the number starting at i, and its value, None for digits int() does not
+    # take (e.g. superscripts), which fail where the parser converts them
+    j = i + 1
+    while j < n and "0" <= text[j] <= "9":
+        j += 1
+    if text[i] > "9" or (j < n and text[j].isdigit()):
+        # other digits than ASCII, int() only takes the decimal ones
+        while j < n and text[j].isdigit():
+            j += 1
+        if not text[i:j].isdecimal():
+            return j, None
+    return j, int(text[i:j])
+
+def _literal_error(text, i, j):
+    return UNEXPECTED_CHARACTER, i, "invalid literal for int() with base 10: %r" % text[i:j]
+
+def _scan_date(values, side, position, count, first_position, first_length, first, second, last, bad=None):
+    # _set_date for the numbers of one segment, given by their count, the first, the
+    # second, the last and the error of the first number int() does not take. Fills
+    # values[side:side + 3] and returns an error or None.
+    if count == 0:
+        return (MISSING_YEAR, position, None) if side == 0 else None
+    state = 0
+    if side == 8:
+        if values[2] is not None:
+            state = 2 if count == 1 else 1 if count == 2 else 0
+        elif values[1] is not None:
+            state = 1 if count == 1 else 0
+    if state == 0 and first_length != 4:
+        return MISSING_YEAR, first_position, None
+    if bad is not None:
+        return bad
+    if state == 0:
+        values[side] = first
+        if count >= 2:
+            values[side + 1] = second
+        if count >= 3:
+            values[side + 2] = last
+    elif state == 1:
+        values[side + 1] = first
+        if count >= 2:
+            values[side + 2] = last
+    else:
+        values[side + 2] = last
+    return None
+
+def _scan_duration(text, i, n):
+    # _parse_duration for the part after the "P" at i. Returns the end of the part,
+    # the duration and the first error.
+    start = i
+    duration = {}
+    designators = _DATE_DESIGNATORS
+    position = 0
+    number = None
+    time = None
+    error = None
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == "/":
+            break
+        if c == "\n":
+            i += 1
+            continue
+        if "0" <= c <= "9" or c.isdigit():
+            j, value = _scan_digits(text, i, n)
+            if error is None:
+                if number is not None:
+                    error = (INVALID_DURATION, i, "Invalid duration")
+                elif value is None:
+                    error = _literal_error(text, i, j)
+                else:
+                    number = value
+            i = j
+            continue
+        if c not in _TOKEN_CHARACTERS:
+            return i, None, (UNEXPECTED_CHARACTER, i, None)
+        if error is None:
+            if c in "YMWDHS" and number is not None:
+                for k in range(position, len(designators)):
+                    if designators[k][0] == c:
+                        duration[designators[k][1]] = number
+                        position = k + 1
+                        number = None
+                        break
+                else:
+                    error = (INVALID_DURATION, i, "Invalid duration designator " + c)
+            elif c == "T" and number is None and designators is _DATE_DESIGNATORS:
+                designators = _TIME_DESIGNATORS
+                position = 0
+                time = len(duration)
+            else:
+                error = (INVALID_DURATION, i, "Invalid duration")
+        i += 1
+    if error is None and (number is not None or not duration or time == len(duration)):
+        error = (INVALID_DURATION, start, "Invalid duration")
+    return i, duration, error
+
+def _scan_repeat(text, i, n):
+    # _parse_repeat for the part after the "R" at i: nothing or a number. Returns the
+    # end of the part, the number of repetitions and the first error.
+    start = i
+    repeat = None
+    bad = None
+    tokens = 0
+    i += 1
+    while i < n:
+        c = text[i]
+        if c == "/":
+            break
+        if c == "\n":
+            i += 1
+            continue
+        if "0" <= c <= "9" or c.isdigit():
+            j, value = _scan_digits(text, i, n)
+            if tokens == 0:
+                repeat = value
+                if value is None:
+                    bad = _literal_error(text, i, j)
+            tokens += 1
+            i = j
+            continue
+        if c not in _TOKEN_CHARACTERS:
+            return i, None, (UNEXPECTED_CHARACTER, i, None)
+        tokens += 2
+        i += 1
+    if tokens > 1:
+        return i, None, (INVALID_DURATION, start, "Invalid repeat")
+    return i, repeat, bad
+
+def _scan(text):
+    # One forward pass over text with the rules of the tokenizer and the parser (see
+    # _tokenize and _disambiguate for the tokens), without tokens, buffers or
+    # exceptions. The values are the components of the start and the end in
+    # _SCAN_FIELDS order, and the error is the (code, position, message) of the
+    # error the parser raises first, the message is None when it follows from the
+    # code and the text (see _scan_message).
+    #
+    # A part (between "/") is split into segments by date time separators. Segments
+    # before a separator are dates, the last one is a time if the part has a separator
+    # or a ":", so each segment is followed both ways until it ends.
+    n = len(text)
+    values = [None] * 16
+    error = None
+    repeating = False
+    repeat = None
+    repeat_error = None
+    structure = None
+    period = None
+    periods = 0
+    duration = None
+    parts = 0
+    first_part = True
+    part_start = 0
+    i = 0
+    while True:
+        side = 0 if parts == 0 else 8
+        head = True
+        colon = False
+        separated = False
+        designator = -1
+        separators = 0
+        part_error = None
+        segment = i
+        count = first_position = first_length = first = second = last = 0
+        bad = None
+        state = 0
+        hours = minutes = seconds = None
+        time_error = None
+        zone_error = None
+        markers = 0
+        marker = -1
+        sign = 1.0
+        utc = False
+        zone_state = 0
+        zone_hours = None
+        zone_minutes = 0.0
+        kind = None
+        while i < n:
+            c = text[i]
+            if "0" <= c <= "9" or (c > "\x7f" and c.isdigit()):
+                j = i + 1
+                while j < n and "0" <= text[j] <= "9":
+                    j += 1
+                if c > "9" or (j < n and text[j] > "\x7f"):
+                    j, value = _scan_digits(text, i, n)
+                else:
+                    value = int(text[i:j])
+                if value is None and bad is None:
+                    bad = _literal_error(text, i, j)
+                if count == 0:
+                    first_position = i
+                    first_length = j - i
+                    first = value
+                elif count == 1:
+                    second = value
+                last = value
+                count += 1
+                if markers == 0:
+                    if time_error is None:
+                        if value is None:
+                            time_error = _literal_error(text, i, j)
+                        elif value > (23 if state == 0 else 59):
+                            time_error = (IMPOSSIBLE_HOURS + state, i, None)
+                        elif state == 0:
+                            hours = value
+                            state = 1
+                        elif state == 1:
+                            minutes = value
+                            state = 2
+                        else:
+                            seconds = value
+                elif markers == 1 and zone_error is None:
+                    if j - i == 4:
+                        if value is not None:
+                            zone_hours = int(text[i:i + 2])
+                            zone_minutes = int(text[i + 2:j])
+                        elif not text[i:i + 2].isdecimal():
+                            zone_error = _literal_error(text, i, i + 2)
+                        else:
+                            zone_error = _literal_error(text, i + 2, j)
+                    elif j - i == 2:
+                        if value is None:
+                            zone_error = _literal_error(text, i, j)
+                        elif zone_state == 0:
+                            zone_hours = value
+                            zone_state = 1
+                        else:
+                            zone_minutes = value
+                head = False
+                i = j
+                continue
+            if c == "/":
+                break
+            if c == "\n":
+                i += 1
+                continue
+            if c == " " or c == "T":
+                if part_error is None:
+                    part_error = _scan_date(values, side, segment, count, first_position, first_length, first, second, last, bad)
+                separators += 1
+                segment = i + 1
+                count = first_position = first_length = first = second = last = 0
+                bad = None
+                state = 0
+                hours = minutes = seconds = None
+                time_error = None
+                markers = 0
+            elif c == "+" or c == "Z" or ((c == "-" or c == "−") and colon):
+                if markers == 0:
+                    marker = i
+                    sign = 1.0 if c == "+" or c == "Z" else -1.0
+                    utc = c == "Z"
+                    zone_error = None
+                    zone_state = 0
+                    zone_hours = None
+                    zone_minutes = 0.0
+                markers += 1
+            elif c == ":":
+                colon = separated = True
+            elif c == "-" or c == "−":
+                separated = True
+                if markers == 0 and time_error is None:
+                    time_error = (UNEXPECTED_TIME_CHARACTER, i, None)
+            elif c in "PYMWDHSR":
+                if head and c == "P":
+                    kind = "period"
+                    i, duration, duration_error = _scan_duration(text, i, n)
+                    break
+                if head and c == "R" and first_part:
+                    kind = "repeat"
+                    i, repeat, repeat_error = _scan_repeat(text, i, n)
+                    break
+                if c != "P" and c != "R" and not separated and designator < 0:
+                    designator = i
+                if markers == 0 and time_error is None:
+                    time_error = (UNEXPECTED_TIME_CHARACTER, i, None)
+            else:
+                return _Scan((UNEXPECTED_CHARACTER, i, None), values, 0, False, None, None, None)
+            head = False
+            i += 1
+        # end of the part
+        if kind == "period":
+            if duration_error is not None and duration_error[0] == UNEXPECTED_CHARACTER and duration_error[2] is None:
+                return _Scan(duration_error, values, 0, False, None, None, None)
+            if periods == 0:
+                period = parts
+                structure = duration_error
+            periods += 1
+            parts += 1
+        elif kind == "repeat":
+            if repeat_error is not None and repeat_error[0] == UNEXPECTED_CHARACTER and repeat_error[2] is None:
+                return _Scan(repeat_error, values, 0, False, None, None, None)
+            repeating = True
         else:
-            month = 12
-        if "day" in self.components["end"] and self.components["end"]["day"] is not None:
-            day = self.components["end"]["day"]
-        elif "day" in self.components["start"] and self.components["start"]["day"] is not None:
-            day = self.components["start"]["day"]
+            if separators > 0 or colon:
+                if time_error is None and markers >= 2:
+                    time_error = (UNEXPECTED_TIME_CHARACTER, marker, None)
+                if time_error is None:
+                    time_error = zone_error
+                if time_error is None:
+                    if hours is not None:
+                        values[side + 3] = hours
+                    if minutes is not None:
+                        values[side + 4] = minutes
+                    if seconds is not None:
+                        values[side + 5] = seconds
+                    if markers > 0:
+                        if utc:
+                            values[side + 6] = 0
+                            values[side + 7] = 0
+                        if zone_hours is not None:
+                            values[side + 6] = sign * (zone_hours + zone_minutes / 60.0)
+                            values[side + 7] = int(sign) * (zone_hours * 60 + int(zone_minutes))
+                elif separators == 0 and markers > 0 and time_error[:2] == (IMPOSSIBLE_HOURS, first_position) and first_length == 4:
+                    # a year read as hours
+                    time_error = (MISSING_TIME, marker, "Impossible hours value: " + text[first_position:first_position + 4])
+                segment_error = time_error
+            else:
+                segment_error = _scan_date(values, side, segment, count, first_position, first_length, first, second, last, bad)
+            if error is None:
+                if designator >= 0:
+                    error = (INVALID_DURATION, designator, "Duration without period designator")
+                elif part_error is not None:
+                    error = part_error
+                else:
+                    error = segment_error
+            parts += 1
+        first_part = False
+        if i >= n:
+            break
+        i += 1
+        part_start = i
+    # the parser checks the repeat and the duration before the dates
+    if repeat_error is not None:
+        error = repeat_error
+    elif repeating and parts != 2:
+        error = (INVALID_DURATION, 0, "Repeating interval needs a start and an end or a duration")
+    elif periods > 0 and (parts != 2 or periods != 1):
+        error = (INVALID_DURATION, 0, "Duration needs a start or an end")
+    elif structure is not None:
+        error = structure
+    return _Scan(error, values, part_start, repeating, repeat, period, duration)
+
+_SCAN_FIELDS = ("year", "month", "day", "hours", "minutes", "seconds", "timezone", "offset")
+
+def _scan_message(text, error):
+    code, position, message = error
+    if message is not None:
+        return message
+    if code == UNEXPECTED_CHARACTER:
+        return "Unexpected character " + text[position]
+    if code == MISSING_YEAR:
+        return "No year in date"
+    if code == UNEXPECTED_TIME_CHARACTER:
+        return "Time includes unexpected character " + ("-" if text[position] == "−" else text[position])
+    end = _scan_digits(text, position, len(text))[0]
+    return ("Impossible hours value: ", "Impossible minutes value: ", "Impossible seconds value: ")[code - IMPOSSIBLE_HOURS] + text[position:end]
+
+def _check_fast(match):
+    # the checks of _scan for a value matched by _FAST
+    groups = match.groups()
+    values = [None] * 16
+    for side, offset in ((0, 0), (8, 10)):
+        year, month, day, hours, minutes, seconds = groups[offset:offset + 6]
+        if year is None:
+            break
+        position = match.start(offset + 1)
+        numbers = [int(number) for number in (year, month, day) if number is not None]
+        error = _scan_date(values, side, position, len(numbers), position, len(year), numbers[0], numbers[1] if len(numbers) > 1 else 0, numbers[-1])
+        if error is not None:
+            return error[:2]
+        for state, value in enumerate((hours, minutes, seconds)):
+            if value is not None and int(value) > (23 if state == 0 else 59):
+                return IMPOSSIBLE_HOURS + state, match.start(offset + 4 + state)
+    return _check_calendar(values, 0 if groups[10] is None else match.start(11))
+
+def _check_calendar(values, end_position):
+    # _check_dates without raising
+    year, month, day = values[0:3]
+    end_year, end_month, end_day = values[8:11]
+    if year is None:
+        return MISSING_YEAR, 0
+    if not _valid_ymd(year, 1 if month is None else month, 1 if day is None else day):
+        return INVALID_DATE, 0
+    if end_year is None:
+        end_year = year
+    if end_month is None:
+        end_month = 12 if month is None else month
+    if end_day is None:
+        if day is not None:
+            end_day = day
+        elif not 1 <= end_month <= 12:
+            return INVALID_DATE, end_position
         else:
-            day = calendar.monthrange(year, month)[1]
-        return datetime.date(year, month, day)
+            end_day = _days_in_month(end_year, end_month)
+    if not _valid_ymd(end_year, end_month, end_day):
+        return INVALID_DATE, end_position
+    return VALID, -1
 
-    def _make_dates(self):
-        self.dates["start"] = self._start_date()
-        self.dates["end"] = self._end_date()
-        self.dates["mid"] = self.dates["start"] + (self.dates["end"] - self.dates["start"]) / 2
+def check(text):
+    # (code, position) of the first error ISODateParser would raise for text, found
+    # without raising it, or (VALID, -1)
+    if not isinstance(text, str):
+        return UNEXPECTED_CHARACTER, 0
+    match = _FAST.match(text)
+    if match is not None:
+        return _check_fast(match)
+    scan = _scan(text)
+    if scan.error is not None:
+        return scan.error[0], scan.error[1]
+    if scan.repeating or scan.period is not None:
+        # the other dates follow from the duration, leave them to the parser
+        try:
+            ISODateParser(text)
+        except ValueError as e:
+            return _error_code(e), 0
+        except (ArithmeticError, LookupError):
+            # dates the arithmetic cannot reach are invalid, never an exception here
+            return (INVALID_DATE if scan.period is None else INVALID_DURATION), 0
+        return VALID, -1
+    return _check_calendar(scan.values, scan.end_position)
 
-    def components(self):
-        return self.components
\ No newline at end of file
+def validate(values):
+    # Exception free bulk check: a mask of valid values (1 or 0), the error codes and
+    # the positions of the errors in each value (-1 for valid ones).
+    valid = array("B")
+    codes = array("B")
+    positions = array("q")
+    for text in values:
+        code, position = check(text)
+        valid.append(code == VALID)
+        codes.append(code)
+        positions.append(position)
+    return Validation(valid, codes, positions)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from isodateparser import ParseCache, parse_many
+
+_DONE = object()
+
+class _Failure(object):
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+async def _iterate(source):
+    if hasattr(source, "__aiter__"):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+async def _produce(source, queue, batch_size):
+    try:
+        batch = []
+        async for item in _iterate(source):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+        await queue.put(_DONE)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await queue.put(_Failure(e))
+
+def _parse_batch(batch, errors):
+    # Runs in the executor, possibly in another process, so it only shares a cache
+    # with the rest of its own batch.
+    results = []
+    try:
+        for result in parse_many(batch, cache=ParseCache(len(batch)), errors=errors):
+            results.append(result)
+    except ValueError as e:
+        return results, str(e)
+    return results, None
+
+async def aparse(source, batch_size=1000, executor=None, cache=None, errors="raise", prefetch=2):
+    if errors not in ("raise", "ignore"):
+        raise ValueError("errors must be 'raise' or 'ignore'")
+    loop = asyncio.get_running_loop()
+    # the producer blocks once prefetch batches are waiting, so a slow consumer
+    # holds back the source instead of letting batches pile up
+    queue = asyncio.Queue(maxsize=max(1, prefetch))
+    producer = loop.create_task(_produce(source, queue, batch_size))
+    try:
+        while True:
+            batch = await queue.get()
+            if batch is _DONE:
+                break
+            if isinstance(batch, _Failure):
+                raise batch.error
+            if executor is None:
+                for result in parse_many(batch, cache=cache, errors=errors):
+                    yield result
+            else:
+                results, error = await loop.run_in_executor(executor, _parse_batch, batch, errors)
+                for result in results:
+                    yield result
+                if error is not None:
+                    raise ValueError(error)
+            await asyncio.sleep(0)
+    finally:
+        producer.cancel()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import argparse
+import csv
+import io
+import sys
+import time
+from collections import namedtuple
+from isodateparser import ParseCache, _FIELDS
+
+ParseStats = namedtuple("ParseStats", ["rows", "errors", "seconds", "rows_per_second"])
+
+def _open(path, mode):
+    # Returns the file and what to call when done. stdin and stdout are wrapped again
+    # as UTF-8 without newline translation, as csv needs for quoted newlines, and
+    # detached instead of closed.
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        if not hasattr(stream, "buffer"):
+            return stream, stream.flush
+        stream.flush()
+        wrapper = io.TextIOWrapper(stream.buffer, encoding="utf-8", newline="")
+        return wrapper, wrapper.detach
+    f = io.open(path, mode, encoding="utf-8", newline="")
+    return f, f.close
+
+def parse_csv(infile, outfile, column="eventDate", delimiter=",", components=False, errorfile=None, cache=None, quoting=csv.QUOTE_MINIMAL):
+    if cache is None:
+        cache = ParseCache()
+    options = {"delimiter": delimiter, "quoting": quoting, "lineterminator": "\n"}
+    if quoting == csv.QUOTE_NONE:
+        options["quotechar"] = None
+    reader = csv.reader(infile, **options)
+    writer = csv.writer(outfile, **options)
+    errors = csv.writer(errorfile, **options) if errorfile is not None else None
+
+    started = time.perf_counter()
+    rows = 0
+    failed = 0
+
+    header = next(reader, None)
+    if header is None:
+        return ParseStats(0, 0, 0.0, 0.0)
+    try:
+        index = header.index(column)
+    except ValueError:
+        raise ValueError("Column not found: " + column)
+    added = ["start", "mid", "end"]
+    if components:
+        added += [which + "_" + field for which in ("start", "end") for field in _FIELDS]
+    writer.writerow(header + added)
+    if errors is not None:
+        errors.writerow(["line", column, "error"])
+    empty = [""] * len(added)
+    width = len(header)
+
+    for row in reader:
+        rows += 1
+        if len(row) < width:
+            row += [""] * (width - len(row))
+        value = row[index].strip()
+        if value == "":
+            writer.writerow(row + empty)
+            continue
+        try:
+            result = cache.get(value)
+            extra = [result.start_date.isoformat(), result.mid_date.isoformat(), result.end_date.isoformat()]
+        except ValueError as e:
+            failed += 1
+            if errors is not None:
+                errors.writerow([reader.line_num, value, str(e)])
+            writer.writerow(row + empty)
+            continue
+        if components:
+            extra += ["" if v is None else str(v) for v in result.start + result.end]
+        writer.writerow(row + extra)
+
+    seconds = time.perf_counter() - started
+    return ParseStats(rows, failed, seconds, rows / seconds if seconds > 0 else 0.0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="isodateparser", description="Add start, mid and end dates for an ISO 8601 column of a delimited file")
+    parser.add_argument("input", help="input file, - for stdin")
+    parser.add_argument("output", help="output file, - for stdout")
+    parser.add_argument("-c", "--column", default="eventDate", help="column to parse (default: eventDate)")
+    parser.add_argument("-d", "--delimiter", default=",", help="field delimiter, use tab for tab separated files (default: ,)")
+    parser.add_argument("--no-quoting", action="store_true", help="fields are not quoted, as in many Darwin Core Archive text files")
+    parser.add_argument("--components", action="store_true", help="also write the parsed components")
+    parser.add_argument("-e", "--errors", help="write the line number, value and error of values that could not be parsed to this file")
+    parser.add_argument("--cache-size", type=int, default=65536, help="number of distinct values to cache (default: 65536)")
+    args = parser.parse_args(argv)
+
+    delimiter = "\t" if args.delimiter in ("tab", "\\t") else args.delimiter
+    infile, done_in = _open(args.input, "r")
+    outfile, done_out = _open(args.output, "w")
+    errorfile = io.open(args.errors, "w", encoding="utf-8", newline="") if args.errors else None
+    try:
+        quoting = csv.QUOTE_NONE if args.no_quoting else csv.QUOTE_MINIMAL
+        stats = parse_csv(infile, outfile, args.column, delimiter, args.components, errorfile, ParseCache(args.cache_size), quoting)
+    except ValueError as e:
+        parser.exit(2, "isodateparser: error: " + str(e) + "\n")
+    finally:
+        done_in()
+        done_out()
+        if errorfile is not None:
+            errorfile.close()
+    sys.stderr.write("%d rows, %d errors, %.2f s, %.0f rows/s\n" % stats)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import datetime
+from array import array
+from isodateparser import ISODateParser, ParseCache, _start_ymd, _end_ymd, _ordinal
+
+GRANULARITIES = ("year", "month", "day")
+
+def _bounds(result):
+    # first and last (year, month, day) of a result, with the filling rules of the dates
+    if isinstance(result, ISODateParser):
+        start = result._components("start")
+        end = result._components("end")
+    else:
+        start = result.start
+        end = result.end
+    return _start_ymd(start[0], start[1], start[2]), _end_ymd(start[0], start[1], start[2], end[0], end[1], end[2])
+
+def _bucket(granularity, ymd):
+    year, month, day = ymd
+    if granularity == "year":
+        return year
+    if granularity == "month":
+        return year * 12 + month - 1
+    return _ordinal(year, month, day)
+
+def _label(granularity, bucket):
+    if granularity == "year":
+        return bucket
+    if granularity == "month":
+        return bucket // 12, bucket % 12 + 1
+    return datetime.date.fromordinal(bucket)
+
+class _Counts(object):
+    # Difference array over the buckets from base on: adding a range touches two
+    # entries, the counts are its running sum. Grows to the buckets seen so far.
+    __slots__ = ("base", "diff")
+
+    def __init__(self):
+        self.base = None
+        self.diff = array("q")
+
+    def _cover(self, first, last):
+        if self.base is None:
+            self.base = first
+        if first < self.base:
+            # grow down by at least the current size, to keep prepending rare
+            grow = max(self.base - first, len(self.diff))
+            self.diff = array("q", bytes(8 * grow)) + self.diff
+            self.base -= grow
+        size = last - self.base + 1
+        if size > len(self.diff):
+            self.diff.extend(array("q", bytes(8 * max(size - len(self.diff), len(self.diff)))))
+
+    def add(self, first, last, count=1):
+        # count on every bucket from first to last, last included
+        self._cover(first, last + 1)
+        self.diff[first - self.base] += count
+        self.diff[last + 1 - self.base] -= count
+
+    def merge(self, other):
+        if other.base is None:
+            return
+        self._cover(other.base, other.base + len(other.diff) - 1)
+        offset = other.base - self.base
+        diff = self.diff
+        for i, value in enumerate(other.diff):
+            if value:
+                diff[offset + i] += value
+
+    def counts(self):
+        # (bucket, count) of the buckets with a count
+        total = 0
+        base = self.base
+        for i, value in enumerate(self.diff):
+            total += value
+            if total:
+                yield base + i, total
+
+class Coverage(object):
+    # Streaming temporal coverage: how many records overlap each year, month or day.
+    # A range counts once in every bucket it spans, with the same month end rules as
+    # the dates (1990-01/2014-05 ends on 2014-05-31). Memory depends on the span of
+    # the buckets, not on the number of records, and partial aggregates of workers
+    # can be merged.
+
+    def __init__(self, granularities=GRANULARITIES):
+        for granularity in granularities:
+            if granularity not in GRANULARITIES:
+                raise ValueError("Unknown granularity: " + str(granularity))
+        self.granularities = tuple(granularities)
+        self.records = 0
+        self.errors = 0
+        self.inverted = 0
+        self._counts = dict((granularity, _Counts()) for granularity in self.granularities)
+
+    def add(self, result):
+        # result is a ParsedInterval or ISODateParser, ranges ending before they start
+        # are not counted
+        start, end = _bounds(result)
+        if end < start:
+            self.inverted += 1
+            return
+        self.records += 1
+        for granularity in self.granularities:
+            self._counts[granularity].add(_bucket(granularity, start), _bucket(granularity, end))
+
+    def update(self, values, cache=None):
+        # values are strings, or results as for add(); strings that cannot be parsed
+        # and None are counted in errors
+        if cache is None:
+            cache = ParseCache()
+        for value in values:
+            if isinstance(value, str):
+                try:
+                    value = cache.get(value)
+                except ValueError:
+                    self.errors += 1
+                    continue
+            elif value is None:
+                self.errors += 1
+                continue
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        if other.granularities != self.granularities:
+            raise ValueError("Cannot merge coverage with other granularities")
+        for granularity in self.granularities:
+            self._counts[granularity].merge(other._counts[granularity])
+        self.records += other.records
+        self.errors += other.errors
+        self.inverted += other.inverted
+        return self
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def counts(self, granularity="year"):
+        # {year: count}, {(year, month): count} or {date: count} in bucket order, for
+        # the buckets with a count
+        if granularity not in self._counts:
+            raise ValueError("Granularity not aggregated: " + str(granularity))
+        return dict((_label(granularity, bucket), count) for bucket, count in self._counts[granularity].counts())
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import re
+from collections import namedtuple
+from isodateparser import default_cache
+
+DateMatch = namedtuple("DateMatch", ["start", "end", "text", "result"])
+
+# Candidates start at a run of four digits, which the regex engine skips to in C,
+# and take the longest date, date time or interval from there. A time needs "T" or,
+# after a space, hours and minutes, so "2010-01-01 10 apples" stays a date.
+_ZONE = r"(?:Z|[+-]\d{2}(?::?\d{2})?)?"
+_TIME = r"(?:T\d{2}(?::\d{2}(?::\d{2})?)?|[ ]\d{2}:\d{2}(?::\d{2})?)" + _ZONE
+_POINT = r"\d{4}(?:-\d{2}(?:-\d{2}(?:" + _TIME + r")?)?)?"
+_END = r"(?:T?\d{2}:\d{2}(?::\d{2})?" + _ZONE + "|" + _POINT + r"|\d{2}(?:-\d{2})?(?:" + _TIME + r")?|P[0-9YMWDTHS]{1,32})"
+_CANDIDATE = re.compile(r"(?<![\w.:/-])" + _POINT + "(?:/" + _END + ")?", re.ASCII)
+# a candidate followed by a letter or digit is part of some other token ("1990s",
+# "1999-2010") and is skipped, and so is a time with a decimal fraction
+# ("10:00:00,5"); after a date a comma starts the next item of a list
+_AFTER = re.compile(r"\w|[:/-]\d", re.ASCII)
+_FRACTION = re.compile(r"[.,]\d", re.ASCII)
+# longer than any candidate plus the characters _AFTER looks at
+_LOOKAHEAD = 128
+
+def _find(text, position, safe, get, offset=0):
+    # Yields matches in text from position on and returns where to resume. Candidates
+    # ending after safe could still grow with more text and are left for the next call.
+    search = _CANDIDATE.search
+    after = _AFTER.match
+    fraction = _FRACTION.match
+    while True:
+        match = search(text, position)
+        if match is None:
+            return max(position, safe)
+        start, end = match.span()
+        if end > safe:
+            return start
+        # a time ends in minutes or seconds (":00") or in hours ("T10")
+        if after(text, end) is not None or (text[end - 3] in ":T" and fraction(text, end) is not None):
+            position = start + 4
+            continue
+        value = match.group()
+        try:
+            result = get(value)
+        except ValueError:
+            pass
+        else:
+            yield DateMatch(offset + start, offset + end, value, result)
+        position = end
+
+def find_dates(text, cache=None):
+    # Yields a DateMatch with the span, the text and the parsed interval of every
+    # date or interval in a string, in order. Invalid dates such as 2010-02-30 are
+    # skipped.
+    if cache is None:
+        cache = default_cache
+    yield from _find(text, 0, len(text), cache.get)
+
+def find_dates_stream(chunks, cache=None):
+    # find_dates over text arriving in pieces, e.g. iter(partial(f.read, 1 << 20), ""),
+    # with spans counted from the start of the stream. A date split across chunks is
+    # found once; only the last few characters of a chunk are kept for the next one.
+    if cache is None:
+        cache = default_cache
+    get = cache.get
+    carry = ""
+    offset = 0
+    position = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        text = carry + chunk
+        position = yield from _find(text, position, len(text) - _LOOKAHEAD, get, offset)
+        # keep the character before position for the lookbehind of the next candidate
+        keep = max(position - 1, 0)
+        carry = text[keep:]
+        offset += keep
+        position -= keep
+    if carry:
+        yield from _find(carry, position, len(carry), get, offset)
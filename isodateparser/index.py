@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+import datetime
+import heapq
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+# File layout: header, then the starts, ends, max ends and ids as native int64 arrays.
+_MAGIC = b"ISOIDX01"
+_HEADER = struct.Struct("<8sqq?7x")
+
+def _build(starts, ends):
+    # Implicit interval tree over intervals sorted by start (as in cgranges): the node
+    # at index i on level k covers 2^(k+1) - 1 entries around it and stores the largest
+    # end of that subtree. Returns the max ends and the level of the root.
+    n = len(starts)
+    maxends = array("q", ends)
+    if n == 0:
+        return maxends, 0
+    last_i = 0
+    last = 0
+    for i in range(0, n, 2):
+        last_i = i
+        last = maxends[i]
+    k = 1
+    while 1 << k <= n:
+        x = 1 << (k - 1)
+        for i in range((x << 1) - 1, n, x << 2):
+            right = maxends[i + x] if i + x < n else last
+            maxends[i] = max(ends[i], maxends[i - x], right)
+        last_i = last_i - x if last_i >> k & 1 else last_i + x
+        if last_i < n and maxends[last_i] > last:
+            last = maxends[last_i]
+        k += 1
+    return maxends, k - 1
+
+# Inserted intervals wait in a list of at most _PENDING, which then becomes a small
+# tree. Trees of similar size are merged like the digits of a binary counter, the
+# main tree included, so a query visits O(log n) trees and a few pending intervals.
+_PENDING = 64
+
+class _Tree(object):
+    # intervals sorted by start, as half-open [start, end)
+    __slots__ = ("starts", "ends", "maxends", "ids", "root")
+
+    def __init__(self, starts, ends, ids, maxends=None, root=0):
+        if maxends is None:
+            maxends, root = _build(starts, ends)
+        self.starts = starts
+        self.ends = ends
+        self.maxends = maxends
+        self.ids = ids
+        self.root = root
+
+    @classmethod
+    def from_sorted(cls, intervals):
+        return cls(array("q", [interval[0] for interval in intervals]), array("q", [interval[1] for interval in intervals]), array("q", [interval[2] for interval in intervals]))
+
+    def intervals(self):
+        return zip(self.starts, self.ends, self.ids)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlap(self, start, end):
+        # positions of intervals overlapping the half-open [start, end)
+        starts, ends, maxends = self.starts, self.ends, self.maxends
+        n = len(starts)
+        found = []
+        if n == 0:
+            return found
+        stack = [((1 << self.root) - 1, self.root, False)]
+        while stack:
+            x, k, visited = stack.pop()
+            if k <= 3:
+                # small subtree, scan it
+                i = x >> k << k
+                last = min(i + (1 << (k + 1)) - 1, n)
+                while i < last and starts[i] < end:
+                    if start < ends[i]:
+                        found.append(i)
+                    i += 1
+            elif not visited:
+                y = x - (1 << (k - 1))
+                stack.append((x, k, True))
+                if y >= n or maxends[y] > start:
+                    stack.append((y, k - 1, False))
+            elif x < n and starts[x] < end:
+                if start < ends[x]:
+                    found.append(x)
+                stack.append((x + (1 << (k - 1)), k - 1, False))
+        return found
+
+class IntervalIndex(object):
+    # Intervals are closed [start, end] integers, day ordinals by default or Unix
+    # seconds with epochs=True. Queries return ids in start order for an index built
+    # at once, inserted intervals may follow out of order until the next save.
+    # Ranges that end before they start (2014-05/1990-01) are skipped and counted in
+    # inverted, as in Coverage.
+
+    def __init__(self, epochs=False):
+        self.epochs = epochs
+        self.inverted = 0
+        self._tree = _Tree(array("q"), array("q"), array("q"))
+        self._runs = []
+        self._pending = []
+        self._buffer = None
+
+    @classmethod
+    def from_intervals(cls, intervals, epochs=False):
+        # intervals is an iterable of (start, end, id)
+        index = cls(epochs)
+        for start, end, id in intervals:
+            index._add(int(start), int(end), id)
+        index._merge()
+        return index
+
+    @classmethod
+    def from_results(cls, results, ids=None, epochs=False):
+        # results are ParsedInterval or ISODateParser objects, None entries are skipped;
+        # ids default to the position of each result
+        def intervals():
+            for position, result in enumerate(results):
+                if result is not None:
+                    bounds = result.epochs() if epochs else result.ordinals()
+                    yield bounds[0], bounds[2], position if ids is None else ids[position]
+        return cls.from_intervals(intervals(), epochs)
+
+    def insert(self, start, end, id):
+        self._add(self._point(start), self._point(end), id)
+        if len(self._pending) >= _PENDING:
+            self._carry()
+
+    def _add(self, start, end, id):
+        if end < start:
+            self.inverted += 1
+        else:
+            self._pending.append((start, end + 1, int(id)))
+
+    def _carry(self):
+        # the pending intervals become a tree, merged with the smaller trees and with
+        # the main tree once the merged run is as large as they are
+        run = sorted(self._pending)
+        self._pending = []
+        runs = self._runs
+        while runs and len(runs[-1]) <= len(run):
+            run = list(heapq.merge(runs.pop().intervals(), run))
+        if len(run) >= len(self._tree):
+            self._tree = _Tree.from_sorted(list(heapq.merge(self._tree.intervals(), run)))
+            self._buffer = None
+        else:
+            runs.append(_Tree.from_sorted(run))
+
+    def _merge(self):
+        intervals = list(self._tree.intervals())
+        for tree in self._runs:
+            intervals.extend(tree.intervals())
+        intervals.extend(self._pending)
+        intervals.sort()
+        self._runs = []
+        self._pending = []
+        self._buffer = None
+        self._tree = _Tree.from_sorted(intervals)
+
+    def _point(self, value):
+        if isinstance(value, datetime.datetime):
+            if self.epochs:
+                if value.tzinfo is None:
+                    value = value.replace(tzinfo=datetime.timezone.utc)
+                return int(value.timestamp())
+            return value.toordinal()
+        if isinstance(value, datetime.date):
+            if self.epochs:
+                return (value.toordinal() - 719163) * 86400
+            return value.toordinal()
+        return int(value)
+
+    def overlapping(self, start, end=None):
+        start = self._point(start)
+        end = start if end is None else self._point(end)
+        result = []
+        for tree in [self._tree] + self._runs:
+            ids = tree.ids
+            result.extend(ids[i] for i in tree.overlap(start, end + 1))
+        result.extend(interval[2] for interval in self._pending if interval[0] <= end and interval[1] > start)
+        return result
+
+    def at(self, point):
+        return self.overlapping(point)
+
+    def containing(self, start, end=None):
+        # intervals that contain all of [start, end]
+        start = self._point(start)
+        end = start if end is None else self._point(end)
+        result = []
+        for tree in [self._tree] + self._runs:
+            ends, ids = tree.ends, tree.ids
+            result.extend(ids[i] for i in tree.overlap(start, start + 1) if ends[i] > end)
+        result.extend(interval[2] for interval in self._pending if interval[0] <= start and interval[1] > end)
+        return result
+
+    def within(self, start, end):
+        # Intervals that lie entirely within [start, end]. Found by start with a binary
+        # search, so the cost grows with the intervals starting in the range, matching
+        # or not.
+        start = self._point(start)
+        end = self._point(end)
+        result = []
+        for tree in [self._tree] + self._runs:
+            starts, ends, ids = tree.starts, tree.ends, tree.ids
+            result.extend(ids[i] for i in range(bisect_left(starts, start), bisect_right(starts, end)) if ends[i] <= end + 1)
+        result.extend(interval[2] for interval in self._pending if interval[0] >= start and interval[1] <= end + 1)
+        return result
+
+    def __len__(self):
+        return len(self._tree) + sum(len(tree) for tree in self._runs) + len(self._pending)
+
+    def save(self, path):
+        if self._runs or self._pending:
+            self._merge()
+        tree = self._tree
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(tree), tree.root, self.epochs))
+            for values in (tree.starts, tree.ends, tree.maxends, tree.ids):
+                f.write(values)
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        # With use_mmap the arrays are views on the mapped file and nothing is copied.
+        with open(path, "rb") as f:
+            if use_mmap:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = f.read()
+        magic, n, root, epochs = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not an interval index file: " + str(path))
+        index = cls(epochs)
+        if use_mmap:
+            index._buffer = data
+        view = memoryview(data)
+        offset = _HEADER.size
+        columns = []
+        for i in range(4):
+            column = view[offset:offset + n * 8].cast("q")
+            if not use_mmap:
+                column = array("q", column)
+            columns.append(column)
+            offset += n * 8
+        starts, ends, maxends, ids = columns
+        index._tree = _Tree(starts, ends, ids, maxends, root)
+        return index
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import json
+import sqlite3
+import time
+from collections import OrderedDict, namedtuple
+from isodateparser import ISODateParser, ParsedInterval, Components, _NO_COMPONENTS, __version__
+
+# evictions are from the in-memory LRU as in ParseCache, deleted are rows removed
+# from the file when it holds more than maxsize entries
+PersistentCacheInfo = namedtuple("PersistentCacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize", "hit_rate", "loaded", "load_seconds", "deleted"])
+
+# One row per distinct input and library version. used is the time (Unix seconds)
+# of the last run that got the entry, the least recently used rows are evicted.
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries (text TEXT NOT NULL, version TEXT NOT NULL, value TEXT, error TEXT, used REAL NOT NULL, PRIMARY KEY (text, version))",
+    "CREATE INDEX IF NOT EXISTS entries_used ON entries (used)"
+)
+
+def _encode(result):
+    if isinstance(result, ValueError):
+        return None, str(result)
+    return json.dumps([result.start, result.end]), None
+
+def _decode(value):
+    start, end = json.loads(value)
+    end = Components(*end)
+    return ParsedInterval(Components(*start), _NO_COMPONENTS if end == _NO_COMPONENTS else end)
+
+class PersistentCache(object):
+    # ParseCache backed by a SQLite file, so later runs and other processes start
+    # warm. The most recently used entries of this version are loaded on open, new
+    # entries and hits are written in batches of flush_every and on flush() or
+    # close(). The file runs in WAL mode, readers do not block each other or the
+    # writer, and the writers wait up to timeout seconds for each other.
+
+    def __init__(self, path, maxsize=1000000, version=__version__, flush_every=10000, timeout=30.0):
+        if maxsize < 0:
+            raise ValueError("Cache size must not be negative")
+        self.path = path
+        self.maxsize = maxsize
+        self.version = version
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.deleted = 0
+        self._entries = OrderedDict()
+        self._added = {}
+        self._used = []
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._write(lambda cursor: [cursor.execute(statement) for statement in _SCHEMA])
+        self.loaded, self.load_seconds = self._load()
+
+    def _load(self):
+        # Entries stay (rowid, value, error) rows until first used, so opening a large
+        # cache stays cheap. They are decoded then, and marked as used by this run.
+        started = time.perf_counter()
+        entries = self._entries
+        rows = self._connection.execute("SELECT rowid, text, value, error FROM entries WHERE version = ? ORDER BY used DESC LIMIT ?", (self.version, self.maxsize))
+        for rowid, text, value, error in rows:
+            entries[text] = (rowid, value, error)
+        # most recently used last, as after get()
+        for text in reversed(list(entries)):
+            entries.move_to_end(text)
+        return len(entries), time.perf_counter() - started
+
+    def get(self, text):
+        entries = self._entries
+        try:
+            result = entries[text]
+        except KeyError:
+            self.misses += 1
+            try:
+                result = ParsedInterval.from_parser(ISODateParser(text))
+            except ValueError as e:
+                result = e
+            if self.maxsize > 0:
+                entries[text] = result
+                self._added[text] = result
+                if len(entries) > self.maxsize:
+                    entries.popitem(last=False)
+                    self.evictions += 1
+        else:
+            self.hits += 1
+            entries.move_to_end(text)
+            if isinstance(result, tuple):
+                rowid, value, error = result
+                result = entries[text] = ValueError(error) if value is None else _decode(value)
+                self._used.append(rowid)
+        if len(self._added) + len(self._used) >= self.flush_every:
+            self.flush()
+        if isinstance(result, ValueError):
+            raise ValueError(*result.args)
+        return result
+
+    def _write(self, function):
+        cursor = self._connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            function(cursor)
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+    def flush(self):
+        if not self._added and not self._used:
+            return
+        now = time.time()
+        version = self.version
+        added = [(text, version) + _encode(result) + (now,) for text, result in self._added.items()]
+        # a rowid that changed since the load (the row was replaced by another process)
+        # only misses its update
+        used = [(now, rowid) for rowid in self._used]
+        evicted = []
+
+        def write(cursor):
+            cursor.executemany("INSERT OR REPLACE INTO entries (text, version, value, error, used) VALUES (?, ?, ?, ?, ?)", added)
+            cursor.executemany("UPDATE entries SET used = ? WHERE rowid = ?", used)
+            excess = cursor.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.maxsize
+            if excess > 0:
+                cursor.execute("DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY used LIMIT ?)", (excess,))
+                evicted.append(excess)
+
+        self._write(write)
+        self.deleted += sum(evicted)
+        self._added = {}
+        self._used = []
+
+    def clear(self):
+        # removes the entries of all versions, for every process using the file
+        self._write(lambda cursor: cursor.execute("DELETE FROM entries"))
+        self._entries.clear()
+        self._added = {}
+        self._used = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.deleted = 0
+
+    def info(self):
+        total = self.hits + self.misses
+        return PersistentCacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries), self.hits / float(total) if total else 0.0, self.loaded, self.load_seconds, self.deleted)
+
+    def close(self):
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+import numpy as np
+from isodateparser import ISODateParser
+
+DateArrays = namedtuple("DateArrays", ["start", "mid", "end", "valid"])
+
+# Fixed-width shapes handled with array operations. "9" is a digit and "T" is the
+# date time separator ("T" or space), anything else is matched literally. Ranges
+# of two values with the same shape are handled as well.
+_SHAPES = (
+    "9999",
+    "9999-99",
+    "9999-99-99",
+    "9999-99-99T99:99",
+    "9999-99-99T99:99Z",
+    "9999-99-99T99:99:99",
+    "9999-99-99T99:99:99Z"
+)
+
+_DIGIT = ord("0")
+
+def _number(digits, first, last):
+    value = digits[:, first].astype(np.int64)
+    for i in range(first + 1, last):
+        value = value * 10 + digits[:, i]
+    return value
+
+def _match(codes, shape, offset):
+    ok = np.ones(codes.shape[0], dtype=bool)
+    for i, c in enumerate(shape):
+        column = codes[:, offset + i]
+        if c == "9":
+            ok &= (column - _DIGIT) <= 9
+        elif c == "T":
+            ok &= (column == ord("T")) | (column == ord(" "))
+        else:
+            ok &= column == ord(c)
+    return ok
+
+def _part(codes, shape, offset):
+    # returns year, month, day and a mask of values the scalar parser would accept
+    digits = codes[:, offset:offset + len(shape)].astype(np.int64) - _DIGIT
+    year = _number(digits, 0, 4)
+    ok = year >= 1
+    month = _number(digits, 5, 7) if len(shape) >= 7 else None
+    day = _number(digits, 8, 10) if len(shape) >= 10 else None
+    if month is not None:
+        ok &= (month >= 1) & (month <= 12)
+    if day is not None:
+        ok &= (day >= 1) & (day <= _days_in_month(year, np.clip(month, 1, 12)))
+    if len(shape) >= 16:
+        ok &= _number(digits, 11, 13) <= 23
+        ok &= _number(digits, 14, 16) <= 59
+    if len(shape) >= 19:
+        ok &= _number(digits, 17, 19) <= 59
+    return year, month, day, ok
+
+def _month_start(year, month):
+    return ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]").astype("datetime64[D]")
+
+def _days_in_month(year, month):
+    return (_month_start(year, month + 1) - _month_start(year, month)).astype(np.int64)
+
+def _start_dates(year, month, day):
+    if month is None:
+        month = np.ones_like(year)
+    start = _month_start(year, month)
+    if day is not None:
+        start = start + (day - 1)
+    return start
+
+def _end_dates(year, month, day):
+    # same filling rules as ISODateParser._end_date for an end of the same shape
+    if month is None:
+        month = np.full_like(year, 12)
+    if day is None:
+        return _month_start(year, month + 1) - 1
+    return _month_start(year, month) + (day - 1)
+
+def parse_array(values):
+    values = np.asarray(values)
+    if values.dtype.kind != "U":
+        values = values.astype("U")
+    shape = values.shape
+    values = values.ravel()
+    n = values.size
+
+    start = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    end = start.copy()
+    valid = np.zeros(n, dtype=bool)
+    done = np.zeros(n, dtype=bool)
+
+    width = values.dtype.itemsize // 4
+    if n > 0 and width > 0:
+        codes = values.view(np.uint32).reshape(n, width)
+        lengths = np.char.str_len(values)
+        for part in _SHAPES:
+            size = len(part)
+            for length, is_range in ((size, False), (2 * size + 1, True)):
+                if length > width:
+                    continue
+                rows = np.nonzero((lengths == length) & ~done)[0]
+                if rows.size == 0:
+                    continue
+                sub = codes[rows]
+                matched = _match(sub, part, 0)
+                if is_range:
+                    matched &= (sub[:, size] == ord("/")) & _match(sub, part, size + 1)
+                rows = rows[matched]
+                if rows.size == 0:
+                    continue
+                sub = sub[matched]
+                year, month, day, ok = _part(sub, part, 0)
+                if is_range:
+                    end_year, end_month, end_day, end_ok = _part(sub, part, size + 1)
+                    ok &= end_ok
+                else:
+                    end_year, end_month, end_day = year, month, day
+                done[rows] = True
+                rows = rows[ok]
+                if rows.size == 0:
+                    continue
+                valid[rows] = True
+                start[rows] = _start_dates(year[ok], None if month is None else month[ok], None if day is None else day[ok])
+                end[rows] = _end_dates(end_year[ok], None if end_month is None else end_month[ok], None if end_day is None else end_day[ok])
+
+    # irregular values go through the scalar parser, once per distinct value
+    seen = {}
+    for i in np.nonzero(~done)[0]:
+        text = values[i]
+        if text not in seen:
+            try:
+                parser = ISODateParser(str(text))
+                seen[text] = (parser.start_date, parser.end_date)
+            except ValueError:
+                seen[text] = None
+        result = seen[text]
+        if result is not None:
+            valid[i] = True
+            start[i] = result[0]
+            end[i] = result[1]
+
+    # floor division like date + timedelta / 2, also for ranges ending before they start
+    mid = start + ((end - start).astype(np.int64) // 2).astype("timedelta64[D]")
+    return DateArrays(start.reshape(shape), mid.reshape(shape), end.reshape(shape), valid.reshape(shape))
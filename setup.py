@@ -6,5 +6,13 @@ setup(
     author="Pieter Provoost",
     author_email="pieterprovoost@gmail.com",
     version="0.1.7",
-    packages=["isodateparser"]
+    packages=["isodateparser"],
+    extras_require={
+        "numpy": ["numpy"]
+    },
+    entry_points={
+        "console_scripts": [
+            "isodateparser = isodateparser.cli:main"
+        ]
+    }
 )
@@ -3,8 +3,20 @@ import sys
 import os
 import logging
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
-from isodateparser import ISODateParser
+from isodateparser import ISODateParser, ParsedInterval, ParseCache, parse_many, parse_bytes, parse_lines, parse_file, enable_profiling, disable_profiling
+from isodateparser import validate, check
+from isodateparser.persistent import PersistentCache
+from isodateparser.coverage import Coverage
+from isodateparser.extract import find_dates, find_dates_stream
+import isodateparser
 import datetime
+import io
+import pickle
+import tempfile
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 class Test(unittest.TestCase):
 
@@ -207,5 +219,379 @@ class Test(unittest.TestCase):
         self.assertEqual(dates["start"], datetime.date(1973, 6, 18))
         self.assertEqual(dates["end"], datetime.date(1973, 6, 26))
 
+    def testDuration(self):
+        parser = ISODateParser("2010-01-15/P1M")
+        self.assertEqual(parser.duration, {"months": 1})
+        self.assertEqual(parser.dates["end"], datetime.date(2010, 2, 14))
+        parser = ISODateParser("P3D/2010-01-10")
+        self.assertEqual(parser.dates["start"], datetime.date(2010, 1, 8))
+        # a date end is the last unit covered
+        for text in ["2010/P1Y", "P1Y/2010", "2010-01-01/P1Y", "2010-01/P12M"]:
+            parser = ISODateParser(text)
+            self.assertEqual((parser.start_date, parser.end_date), (datetime.date(2010, 1, 1), datetime.date(2010, 12, 31)))
+        self.assertEqual(Coverage().update(["2010/P1Y"]).counts("year"), {2010: 1})
+        self.assertEqual(ISODateParser("2010-01/P1M").end_date, datetime.date(2010, 1, 31))
+        self.assertEqual(ISODateParser("P1D/2010").start_date, datetime.date(2010, 12, 31))
+        # an end less precise than the start is its last day, not the day of the start
+        for text, start in [("P3D/2010", datetime.date(2010, 12, 29)), ("P2M/2010", datetime.date(2010, 11, 1)), ("P1Y2M/2010", datetime.date(2009, 11, 1))]:
+            parser = ISODateParser(text)
+            self.assertEqual((parser.start_date, parser.end_date), (start, datetime.date(2010, 12, 31)))
+        self.assertEqual([(o.start_date, o.end_date) for o in ISODateParser("R2/P3D/2010").occurrences()], [(datetime.date(2010, 12, 29), datetime.date(2010, 12, 31)), (datetime.date(2010, 12, 26), datetime.date(2010, 12, 28))])
+        result = ISODateParser("2010-01-01T22:00Z/P1DT2H30M").components
+        self.assertEqual((result["end"]["day"], result["end"]["hours"], result["end"]["minutes"]), (3, 0, 30))
+        self.assertEqual(result["end"]["timezone"], 0)
+        for text in ["P1M", "2010/P", "2010/PT", "2010/P1M1Y", "2010/1D"]:
+            with self.assertRaises(ValueError):
+                ISODateParser(text)
+        for text in ["2010-01-01/P99999999999999999999D", "2010-01-01T00:00/PT99999999999999999999S", "P99999999999999999999D/2010-01-01", "9999-12-31/P1D"]:
+            with self.assertRaisesRegex(ValueError, "year -?[0-9]+ is out of range"):
+                ISODateParser(text)
+
+    def testRepeat(self):
+        parser = ISODateParser("R52/2010-01-04/P1W")
+        self.assertEqual(parser.repeat, 52)
+        self.assertEqual(parser.dates["end"], datetime.date(2010, 1, 10))
+        occurrences = list(parser.occurrences())
+        self.assertEqual(len(occurrences), 52)
+        self.assertEqual(occurrences[51].dates["start"], datetime.date(2010, 12, 27))
+        self.assertEqual(parser.span().dates["end"], datetime.date(2011, 1, 2))
+        parser = ISODateParser("R/2010/2011")
+        self.assertEqual(parser.duration, {"years": 2})
+        self.assertEqual([(o.start_date, o.end_date) for o in [next(parser.occurrences())]], [(datetime.date(2010, 1, 1), datetime.date(2011, 12, 31))])
+        parser = ISODateParser("R/2010-01-31/P1M")
+        self.assertIsNone(parser.repeat)
+        self.assertIsNone(parser.span())
+        occurrences = parser.occurrences()
+        self.assertEqual([next(occurrences).start_date for i in range(3)], [datetime.date(2010, 1, 31), datetime.date(2010, 2, 28), datetime.date(2010, 3, 31)])
+        with self.assertRaises(ValueError):
+            ISODateParser("R5/2010")
+        with self.assertRaisesRegex(ValueError, "month must be in 1..12"):
+            ISODateParser("R3/2010-01-01/2010-13-01")
+        with self.assertRaises(ValueError):
+            ISODateParser("R/2010-01/2010-13")
+
+    def testFastPath(self):
+        profiler = enable_profiling()
+        try:
+            for text in ["2010", "2010-01/2012-05", "1973-06-18/26", "2010-01-02T03:04-06:30", "2018-03-01T05:06/07:08"]:
+                ISODateParser(text)
+        finally:
+            disable_profiling()
+        self.assertEqual(profiler.calls["scan"], 1)
+        result = ISODateParser("2010-01-02 03:04:05+0630/2010-01-03T04:05Z").components
+        self.assertEqual(result["start"]["timezone"], 6.5)
+        self.assertEqual(result["end"]["day"], 3)
+        self.assertEqual(result["end"]["timezone"], 0)
+
+    def testParseBytes(self):
+        for text in ["1990-01/2014-05", "2010-01-02T03:04-06:30", "2010\u221201\u221202T03:04\u221206:30", "1973-06-18/26", "2018-03-01T05:06/07:08"]:
+            expected = ParsedInterval.from_parser(ISODateParser(text))
+            data = b"  " + text.encode("utf-8")
+            self.assertEqual(parse_bytes(memoryview(data), 2), expected)
+            self.assertEqual(parse_bytes(bytearray(data), 2).dates["end"], expected.dates["end"])
+        for text in [b"2010-02-30", b"2018-01-01T25:01:01", b"1981-06-01+00:00"]:
+            with self.assertRaises(ValueError):
+                parse_bytes(text)
+
+    def testParseLines(self):
+        data = b"1990-01/2014-05\r\n\n2010\nx\n2:10\n"
+        results = list(parse_lines(data, errors="ignore"))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0].dates["end"], datetime.date(2014, 5, 31))
+        self.assertEqual(results[1:], [None, ParsedInterval.from_parser(ISODateParser("2010")), None, None])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dates.txt")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(list(parse_file(path, errors="ignore")), results)
+
+    def testProfiling(self):
+        profiler = enable_profiling()
+        try:
+            for text in ["2010", "2011", "2018-03-01T05:06/07:08", "2018-01-01T25:01:01", "x"]:
+                try:
+                    ISODateParser(text).dates
+                except ValueError:
+                    pass
+        finally:
+            self.assertIs(disable_profiling(), profiler)
+        self.assertEqual(profiler.shapes["9999"], 2)
+        self.assertEqual(profiler.calls["fast_path"], 4)
+        self.assertEqual(profiler.calls["scan"], 1)
+        self.assertEqual(profiler.calls["check_dates"], 3)
+        self.assertEqual(profiler.calls["make_dates"], 3)
+        self.assertEqual(profiler.failures["Impossible hours value"], 1)
+        self.assertEqual(profiler.failures["Unexpected character"], 1)
+        ISODateParser("2010")
+        self.assertEqual(profiler.calls["fast_path"], 4)
+
+    def testLazyDates(self):
+        parser = ISODateParser("1990-01/2014-05")
+        self.assertEqual(parser._dates, {})
+        self.assertEqual(parser.end_date, datetime.date(2014, 5, 31))
+        self.assertNotIn("start", parser._dates)
+        self.assertEqual(parser.mid_date, datetime.date(2002, 3, 17))
+        self.assertEqual(list(parser.dates), ["start", "mid", "end"])
+
+    def testComponentsOnly(self):
+        with self.assertRaises(ValueError):
+            ISODateParser("2010-02-30")
+        parser = ISODateParser("2010-02-30", components_only=True)
+        self.assertEqual(parser.components["start"]["day"], 30)
+        with self.assertRaises(ValueError):
+            parser.dates
+        with self.assertRaises(ValueError):
+            ISODateParser("2010-13/2011")
+
+    def testOrdinals(self):
+        for text in ["1990-01/2014-05", "2014-05/1990-01", "1973-06-18/26", "2010", "2012-02"]:
+            parser = ISODateParser(text)
+            expected = tuple(parser.dates[key].toordinal() for key in ("start", "mid", "end"))
+            self.assertEqual(parser.ordinals(), expected)
+            self.assertEqual(ParsedInterval.from_parser(parser).ordinals(), expected)
+        with self.assertRaises(ValueError):
+            ISODateParser("2010-02-30", components_only=True).ordinals()
+
+    def testEpochs(self):
+        self.assertEqual(ISODateParser("1970-01-02").epochs(), (86400, 86400, 86400))
+        self.assertEqual(ISODateParser("2017-08-24T14:51:57Z").epochs()[0], 1503586317)
+        self.assertEqual(ISODateParser("1970-01-01T05:45+05:45/1970-01-02T01:00Z").epochs(), (0, 45000, 90000))
+        self.assertEqual(ISODateParser("1970-01-01T10:00/1970-01-03").epochs(), (36000, 122400, 208800))
+
+    def testDatetimes(self):
+        parser = ISODateParser("2017-08-24T20:36:57+05:45")
+        self.assertEqual(parser.components["start"]["offset"], 345)
+        self.assertEqual(ISODateParser("2017-08-24T14:51:57-0330").components["start"]["offset"], -210)
+        start, mid, end = parser.datetimes()
+        self.assertEqual(start, datetime.datetime(2017, 8, 24, 14, 51, 57, tzinfo=datetime.timezone.utc))
+        self.assertIs(start.tzinfo, datetime.timezone.utc)
+        local = parser.datetimes(utc=False)[0]
+        self.assertEqual((local.hour, local.minute), (20, 36))
+        self.assertEqual(local.utcoffset(), datetime.timedelta(minutes=345))
+        self.assertIs(local.tzinfo, ISODateParser("2000-01-01T00:00+05:45").datetimes(utc=False)[0].tzinfo)
+        self.assertEqual(ISODateParser("2017-08-24").datetimes(default_offset=60)[0], datetime.datetime(2017, 8, 23, 23, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(parse_bytes(b"2017-08-24T20:36:57+05:45").datetimes(), parser.datetimes())
+
+    def testValidate(self):
+        result = validate(["1990-01-02", "1990-01-02T25:00", "1990-02-30", "n/a", "90-01", "1990-01-02+05:00", "2010/P1Q", "2010-01-01T10:00/12:00"])
+        self.assertEqual(list(result.valid), [1, 0, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(list(result.codes), [isodateparser.VALID, isodateparser.IMPOSSIBLE_HOURS, isodateparser.INVALID_DATE, isodateparser.UNEXPECTED_CHARACTER, isodateparser.MISSING_YEAR, isodateparser.MISSING_TIME, isodateparser.UNEXPECTED_CHARACTER, isodateparser.VALID])
+        self.assertEqual(list(result.positions), [-1, 11, 0, 0, 0, 10, 7, -1])
+        self.assertEqual(check("2010-01-01/2010-02-30"), (isodateparser.INVALID_DATE, 11))
+        self.assertEqual(check("2010-01-01T10:00+05:00-03:00"), (isodateparser.UNEXPECTED_TIME_CHARACTER, 16))
+        result = validate(["R3/2010-01-01/2010-13-01", "2010-01-01/P99999999999999999999D"])
+        self.assertEqual((list(result.valid), list(result.codes)), ([0, 0], [isodateparser.INVALID_DATE, isodateparser.INVALID_DATE]))
+
+    def testValidateMatchesParser(self):
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../bench"))
+        import corpus
+        texts = [text for shape, text in corpus.generate(5000, mix=dict((shape, 1) for shape in corpus.SHAPES))]
+        # one character replaced, to reach the scanner with unusual shapes
+        texts += [text[:i % len(text)] + c + text[i % len(text) + 1:] for i, text in enumerate(texts[:2000]) if text for c in ":-T/"]
+        for text, valid in zip(texts, validate(texts).valid):
+            try:
+                ISODateParser(text)
+                expected = 1
+            except ValueError:
+                expected = 0
+            self.assertEqual(valid, expected, text)
+
+    def testParsedInterval(self):
+        parser = ISODateParser("1990-01-02T03:04:05/2014-05-31")
+        self.assertIsNone(parser._tokens)
+        self.assertIn("NUMBER (1990)", str(parser))
+        interval = ParsedInterval.from_parser(parser)
+        self.assertEqual(interval.start.hours, 3)
+        self.assertEqual(interval.end.month, 5)
+        self.assertEqual(dict(interval.components["start"]), parser.components["start"])
+        self.assertEqual(dict(interval.dates), parser.dates)
+        copy = pickle.loads(pickle.dumps(interval))
+        self.assertEqual(copy, interval)
+        self.assertEqual(copy.dates["end"], datetime.date(2014, 5, 31))
+        with self.assertRaises(AttributeError):
+            interval.start = None
+
+    def testParseMany(self):
+        cache = ParseCache(maxsize=2)
+        texts = ["1990-01", "2010", "1990-01", "1973-06-18/26"]
+        results = list(parse_many(texts, cache=cache))
+        self.assertEqual(results[0].dates["end"], datetime.date(1990, 1, 31))
+        self.assertEqual(results[1].components["start"]["year"], 2010)
+        self.assertIs(results[0], results[2])
+        self.assertEqual(results[3].dates["end"], datetime.date(1973, 6, 26))
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.evictions, info.currsize), (1, 3, 1, 2))
+        with self.assertRaises(TypeError):
+            results[0].components["start"]["year"] = 1991
+
+    def testParseManyErrors(self):
+        cache = ParseCache()
+        with self.assertRaises(ValueError):
+            list(parse_many(["2010", "--"], cache=cache))
+        self.assertEqual(list(parse_many(["--", "2010"], cache=cache, errors="ignore"))[0], None)
+        self.assertEqual(cache.info().hits, 2)
+        self.assertEqual(list(parse_many(["2:10", "2010", "12:00"], cache=cache, errors="ignore"))[0::2], [None, None])
+        with self.assertRaisesRegex(ValueError, "No year in date"):
+            list(parse_many(["12:00"], cache=cache))
+        with self.assertRaises(TypeError):
+            list(parse_many([None], cache=cache, errors="ignore"))
+
+    def testPersistentCache(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+        with PersistentCache(path) as cache:
+            self.assertEqual(cache.get("2010-01-01T10:00Z/2010-01-02").end_date, datetime.date(2010, 1, 2))
+            self.assertRaises(ValueError, cache.get, "2010-02-30")
+            self.assertEqual(cache.info().misses, 2)
+        with PersistentCache(path) as cache:
+            self.assertEqual(cache.info().loaded, 2)
+            result = cache.get("2010-01-01T10:00Z/2010-01-02")
+            self.assertEqual(result.components, ISODateParser("2010-01-01T10:00Z/2010-01-02").components)
+            self.assertRaises(ValueError, cache.get, "2010-02-30")
+            self.assertEqual(list(parse_many(["2010"], cache=cache))[0].end_date, datetime.date(2010, 12, 31))
+            self.assertEqual(cache.info()[:3], (2, 1, 0))
+            self.assertEqual(cache.info().hit_rate, 2 / 3.0)
+        with PersistentCache(path, version="0.0.0") as cache:
+            self.assertEqual(cache.info().loaded, 0)
+        with PersistentCache(path, maxsize=2) as cache:
+            cache.get("2011")
+            cache.flush()
+            self.assertEqual((cache.info().evictions, cache.info().deleted), (1, 2))
+            self.assertRaises(ValueError, cache.get, "2:10")
+        with PersistentCache(path) as cache:
+            self.assertEqual(cache.info().loaded, 2)
+            self.assertEqual(cache.info().currsize, 2)
+
+    def testCoverage(self):
+        coverage = Coverage().update(["1990-01/1991-02", "1990-12-31T23:00/1991-01-01", "1991", "2014-05/2013-01", "n/a", None, ISODateParser("1991-02-27/P3D")])
+        self.assertEqual((coverage.records, coverage.errors, coverage.inverted), (4, 2, 1))
+        self.assertEqual(coverage.counts("year"), {1990: 2, 1991: 4})
+        months = coverage.counts("month")
+        self.assertEqual(len(months), 24)
+        self.assertEqual((months[(1990, 1)], months[(1990, 12)], months[(1991, 1)], months[(1991, 2)], months[(1991, 3)]), (1, 2, 3, 3, 2))
+        days = coverage.counts("day")
+        self.assertEqual(days[datetime.date(1991, 1, 1)], 3)
+        self.assertEqual((days[datetime.date(1991, 3, 1)], days[datetime.date(1991, 3, 2)]), (2, 1))
+        self.assertEqual(list(days)[-1], datetime.date(1991, 12, 31))
+        first = Coverage(["month"]).update(["1990-01/1991-02", "1991"])
+        second = pickle.loads(pickle.dumps(Coverage(["month"]).update(["1985-06", "1990-12-31T23:00/1991-01-01"])))
+        first.merge(second)
+        self.assertEqual(first.counts("month"), Coverage(["month"]).update(["1990-01/1991-02", "1991", "1985-06", "1990-12-31T23:00/1991-01-01"]).counts("month"))
+        self.assertRaises(ValueError, first.merge, Coverage())
+        coverage = Coverage().update(["2:10", "2010"], cache=isodateparser.default_cache)
+        self.assertEqual((coverage.records, coverage.errors), (1, 1))
+
+    def testFindDates(self):
+        text = "Collected 2010-01-01/2010-01-05 near site 12345; 1990s, v1.2010, 2011-02-30 and 1999-2010 skipped. Seen 2013-04-05T10:00Z, again 2014-06-01/07."
+        matches = list(find_dates(text, ParseCache()))
+        self.assertEqual([m.text for m in matches], ["2010-01-01/2010-01-05", "2013-04-05T10:00Z", "2014-06-01/07"])
+        self.assertEqual(text[matches[0].start:matches[0].end], "2010-01-01/2010-01-05")
+        self.assertEqual(matches[2].result.end_date, datetime.date(2014, 6, 7))
+        self.assertEqual(matches[1].result.start[3:5], (10, 0))
+        self.assertEqual([m.text for m in find_dates("visits: 2010-01-01,2010-02-03,2010-03-04.")], ["2010-01-01", "2010-02-03", "2010-03-04"])
+        self.assertEqual([m.text for m in find_dates("at 2010-01-01T10:00:00,5 and 2010-01-01T10.5, 2010-01-02T10:00,")], ["2010-01-02T10:00"])
+        # chunk boundaries inside dates, and a time that only arrives with the next chunk
+        text = (text + " 2015-01-01") * 10 + " 2016-02-03T"
+        chunks = [text[i:i + 7] for i in range(0, len(text), 7)] + ["12:30 end"]
+        self.assertEqual(list(find_dates_stream(chunks)), list(find_dates(text + "12:30 end")))
+        self.assertEqual(list(find_dates_stream(chunks))[-1].text, "2016-02-03T12:30")
+
+    def testParseManyParallel(self):
+        texts = ["1990-01/2014-05", "2010", "--", "1990-01", "2010", "2:10"] * 50
+        results = list(parse_many(texts, errors="ignore", workers=2, chunksize=40))
+        self.assertEqual(results, list(parse_many(texts, cache=ParseCache(), errors="ignore")))
+        self.assertIsNone(results[2])
+        self.assertIsNone(results[5])
+        self.assertEqual(results[0].dates["end"], datetime.date(2014, 5, 31))
+        with self.assertRaises(ValueError):
+            list(parse_many(texts, workers=2))
+
+    def testAparse(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        from isodateparser.aio import aparse
+
+        async def source():
+            for text in ["1990-01", "2010", "--", "1973-06-18/26"] * 3:
+                yield text
+
+        async def collect(**kwargs):
+            return [result async for result in aparse(source(), batch_size=5, **kwargs)]
+
+        results = asyncio.run(collect(errors="ignore"))
+        self.assertEqual(len(results), 12)
+        self.assertIsNone(results[6])
+        self.assertEqual(results[3].dates["end"], datetime.date(1973, 6, 26))
+        with ThreadPoolExecutor(1) as executor:
+            self.assertEqual(asyncio.run(collect(errors="ignore", executor=executor)), results)
+            with self.assertRaises(ValueError):
+                asyncio.run(collect(executor=executor))
+        with self.assertRaises(ValueError):
+            asyncio.run(collect())
+
+    def testIntervalIndex(self):
+        from isodateparser.index import IntervalIndex
+        texts = ["1990-01/2014-05", "1992", "1996-01-01/1999-12-31", "1989-12-31", "2000"]
+        index = IntervalIndex.from_results(list(parse_many(texts, cache=ParseCache())))
+        self.assertEqual(sorted(index.overlapping(datetime.date(1990, 1, 1), datetime.date(1995, 12, 31))), [0, 1])
+        self.assertEqual(sorted(index.at(datetime.date(1997, 6, 1))), [0, 2])
+        self.assertEqual(index.containing(datetime.date(1992, 3, 1), datetime.date(1992, 4, 1)), [0, 1])
+        self.assertEqual(index.within(datetime.date(1990, 1, 1), datetime.date(2005, 1, 1)), [1, 2, 4])
+        index.insert(datetime.date(1995, 1, 1), datetime.date(1995, 1, 31), 5)
+        self.assertEqual(sorted(index.overlapping(datetime.date(1995, 1, 31))), [0, 5])
+        # inserts beyond the pending list go into small trees merged like a binary counter
+        inserted = IntervalIndex.from_intervals((i * 10, i * 10 + 25, i) for i in range(100))
+        for i in range(100, 400):
+            inserted.insert(i * 10, i * 10 + 25, i)
+        self.assertEqual(len(inserted), 400)
+        self.assertEqual(sorted(inserted.overlapping(2000, 2010)), [198, 199, 200, 201])
+        self.assertEqual(sorted(inserted.containing(3101, 3110)), [309, 310])
+        self.assertEqual(sorted(inserted.within(1000, 1040)), [100, 101])
+        inverted = IntervalIndex.from_results(list(parse_many(["2014-05/1990-01", "1995"], cache=ParseCache())))
+        inverted.insert(datetime.date(1995, 2, 1), datetime.date(1995, 1, 1), 2)
+        self.assertEqual((len(inverted), inverted.inverted), (1, 2))
+        self.assertEqual((inverted.overlapping(datetime.date(1980, 1, 1), datetime.date(2020, 1, 1)), inverted.within(datetime.date(1980, 1, 1), datetime.date(2020, 1, 1))), ([1], [1]))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.bin")
+            index.save(path)
+            loaded = IntervalIndex.load(path)
+            self.assertEqual(len(loaded), 6)
+            self.assertEqual(sorted(loaded.overlapping(datetime.date(1995, 1, 31))), [0, 5])
+            del loaded
+
+    def testParseCsv(self):
+        from isodateparser.cli import parse_csv
+        infile = io.StringIO("id,eventDate\n1,1990-01/2014-05\n2,\n3,2010-13\n4,1973-06-18/26\n")
+        outfile = io.StringIO()
+        errorfile = io.StringIO()
+        stats = parse_csv(infile, outfile, errorfile=errorfile)
+        self.assertEqual((stats.rows, stats.errors), (4, 1))
+        lines = outfile.getvalue().splitlines()
+        self.assertEqual(lines[0], "id,eventDate,start,mid,end")
+        self.assertEqual(lines[1], "1,1990-01/2014-05,1990-01-01,2002-03-17,2014-05-31")
+        self.assertEqual(lines[2], "2,,,,")
+        self.assertEqual(lines[3], "3,2010-13,,,")
+        self.assertEqual(lines[4], "4,1973-06-18/26,1973-06-18,1973-06-22,1973-06-26")
+        self.assertEqual(errorfile.getvalue().splitlines()[1], "4,2010-13,month must be in 1..12")
+        # stdin and stdout are UTF-8 and keep newlines in quoted fields, whatever the locale
+        import subprocess
+        environment = dict(os.environ, LC_ALL="C", PYTHONIOENCODING="ascii", PYTHONPATH=os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+        output = subprocess.run([sys.executable, "-m", "isodateparser.cli", "-", "-"], input='id,eventDate,remarks\r\n1,2010,"a\r\nb \u00e9"\r\n'.encode("utf-8"), stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=environment, check=True).stdout
+        self.assertEqual(output.decode("utf-8"), 'id,eventDate,remarks,start,mid,end\n1,2010,"a\r\nb \u00e9",2010-01-01,2010-07-02,2010-12-31\n')
+
+    @unittest.skipIf(numpy is None, "numpy not installed")
+    def testParseArray(self):
+        from isodateparser.vectorized import parse_array
+        texts = ["2010", "1990-01/2014-05", "2012-02-30", "1973-06-18/26", "2017-08-24T14:51:57Z", "x", "2014-05/1990-01"]
+        result = parse_array(numpy.array(texts, dtype=object))
+        self.assertEqual(result.valid.tolist(), [True, True, False, True, True, False, True])
+        for i, text in enumerate(texts):
+            if result.valid[i]:
+                parser = ISODateParser(text)
+                self.assertEqual(result.start[i].astype(object), parser.dates["start"])
+                self.assertEqual(result.mid[i].astype(object), parser.dates["mid"])
+                self.assertEqual(result.end[i].astype(object), parser.dates["end"])
+            else:
+                self.assertTrue(numpy.isnat(result.start[i]))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file